@@ -1,15 +1,14 @@
 """Pytest configuration and fixtures for the LLM Story Generator tests.
 
-This module provides test fixtures and configuration for the test suite,
-including temporary directory management and database setup.
+This module provides the database fixtures and configuration for the test
+suite. Directory and document fixtures live in ``tests/conftest.py``.
 """
 import os
+import sqlite3
 import sys
-import pytest
 import tempfile
-import shutil
-from pathlib import Path
-from typing import Dict, Generator, Any
+import pytest
+from typing import Generator
 
 from llm_story_generator.db_manager import DatabaseManager
 
@@ -17,74 +16,83 @@ from llm_story_generator.db_manager import DatabaseManager
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
-@pytest.fixture
-def test_dirs() -> Generator[Dict[str, str], None, None]:
-    """Create temporary directories for testing.
+# Named in-memory database shared by every connection in the test process,
+# one per pytest-xdist worker
+TEST_DB_URI = (
+    f"file:stories_test_{os.environ.get('PYTEST_XDIST_WORKER', 'main')}"
+    "?mode=memory&cache=shared"
+)
+
+# tmpfs keeps WAL writes and fsyncs in RAM; fall back to the regular temp dir
+# where /dev/shm isn't available
+TEST_DB_DIR = (
+    "/dev/shm" if os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+)
+
+@pytest.fixture(scope="session")
+def _session_db_manager() -> Generator[DatabaseManager, None, None]:
+    """Create one in-memory database manager shared by the whole test session.
     
-    Creates a temporary directory structure with subdirectories for docs,
-    memory, and index. Also creates a sample test document.
+    The database lives in RAM, so tests never touch the disk, and running the
+    schema happens once per session rather than once per test.
     
     Yields:
-        Dict[str, str]: Dictionary containing paths to test directories and files.
-            Keys:
-                - temp_dir: Root temporary directory
-                - docs_dir: Directory for test documents
-                - memory_dir: Directory for memory storage
-                - index_dir: Directory for index storage
-                - test_doc: Path to sample test document
-    
-    Note:
-        The temporary directory and its contents are automatically cleaned up
-        after the test completes.
+        DatabaseManager: The shared database manager.
     """
-    # Create temporary directory
-    temp_dir = tempfile.mkdtemp()
-    
-    # Create subdirectories
-    docs_dir = os.path.join(temp_dir, "docs")
-    memory_dir = os.path.join(temp_dir, "memory")
-    index_dir = os.path.join(temp_dir, "index")
-    
-    os.makedirs(docs_dir)
-    os.makedirs(memory_dir)
-    os.makedirs(index_dir)
-    
-    # Create a test document
-    test_doc = os.path.join(docs_dir, "test.txt")
-    with open(test_doc, "w", encoding="utf-8") as f:
-        f.write("This is a test story document.")
+    db = DatabaseManager(db_path=TEST_DB_URI)
+    yield db
+    db.close()
+
+@pytest.fixture(scope="session")
+def ro_conn(
+    _session_db_manager: DatabaseManager
+) -> Generator[sqlite3.Connection, None, None]:
+    """Open one read-only connection to the test database for verifying writes.
     
-    yield {
-        "temp_dir": temp_dir,
-        "docs_dir": docs_dir,
-        "memory_dir": memory_dir,
-        "index_dir": index_dir,
-        "test_doc": test_doc
-    }
+    Args:
+        _session_db_manager: The session-wide database manager, which keeps the
+            in-memory database alive.
     
-    # Cleanup
-    shutil.rmtree(temp_dir)
+    Yields:
+        sqlite3.Connection: A connection that rejects writes and returns
+            ``sqlite3.Row`` results.
+    """
+    conn = sqlite3.connect(TEST_DB_URI, uri=True)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only=TRUE")
+    yield conn
+    conn.close()
 
 @pytest.fixture
-def sample_document(test_dirs: Dict[str, str]) -> str:
-    """Return the path to a sample document.
+def db_manager(
+    _session_db_manager: DatabaseManager
+) -> Generator[DatabaseManager, None, None]:
+    """Provide the shared database manager with empty tables for each test.
     
     Args:
-        test_dirs: Dictionary containing test directory paths.
+        _session_db_manager: The session-wide database manager.
     
-    Returns:
-        str: Path to the sample test document.
+    Yields:
+        DatabaseManager: A configured database manager instance for testing.
     """
-    return test_dirs["test_doc"]
+    yield _session_db_manager
+    # Reset state so tests that write don't leak rows into later tests
+    with _session_db_manager._write() as conn:
+        conn.execute("DELETE FROM story_documents")
+        conn.execute("DELETE FROM documents")
+        conn.execute("DELETE FROM stories")
 
 @pytest.fixture
-def db_manager(test_dirs: Dict[str, str]) -> DatabaseManager:
-    """Create a database manager instance for testing.
+def file_db_path() -> Generator[str, None, None]:
+    """Provide a path for a file-backed test database on tmpfs when possible.
     
-    Args:
-        test_dirs: Dictionary containing test directory paths.
+    Tests that need the real file code path (WAL, separate reader connections)
+    can't use the in-memory database. Placing the file under TEST_DB_DIR keeps
+    its writes off the disk.
     
-    Returns:
-        DatabaseManager: A configured database manager instance for testing.
+    Yields:
+        str: Path to a not-yet-created database file, removed with its WAL and
+            shared-memory files after the test.
     """
-    return DatabaseManager() 
\ No newline at end of file
+    with tempfile.TemporaryDirectory(prefix="storygen-tests-", dir=TEST_DB_DIR) as tmp:
+        yield os.path.join(tmp, "stories.db")
@@ -5,6 +5,7 @@ vector store settings, and logging configuration.
 """
 import os
 import logging
+import functools
 from typing import Dict, Any, Final, List
 from dotenv import load_dotenv
 
@@ -52,7 +53,10 @@ VECTOR_STORE_SETTINGS: Final[Dict[str, Any]] = {
     "chunk_size": 500,
     "chunk_overlap": 50,
     "embedding_model": "all-MiniLM-L6-v2",
-    "k": 3  # Number of documents to retrieve for RAG
+    "embedding_batch_size": 64,  # Chunks per SentenceTransformer forward pass
+    "k": 3,  # Number of documents to retrieve for RAG
+    "ivf_min_chunks": 1000,  # Search an IVF copy of the index from this many chunks
+    "ivf_nprobe": 8  # IVF clusters scanned per query
 }
 
 def ensure_directories() -> None:
@@ -75,5 +79,16 @@ def ensure_directories() -> None:
             logger.error(f"Failed to create directory {directory}: {str(e)}")
             raise
 
-# Create necessary directories
-ensure_directories() 
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def ensure_directories_once() -> None:
+    """Create the necessary directories once per process.
+    
+    Streamlit re-runs its main script on every interaction, but this module stays
+    imported, so repeat calls hit the cache instead of re-issuing the ``makedirs``
+    calls.
+    
+    Raises:
+        Exception: If directory creation fails. Failures are not cached, so the
+            next call tries again.
+    """
+    ensure_directories()
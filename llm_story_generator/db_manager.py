@@ -5,14 +5,203 @@ stories, documents, and their relationships.
 """
 import sqlite3
 import os
+import queue
+import functools
+import threading
+from contextlib import contextmanager
+from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any, Tuple
+from typing import Dict, Iterator, List, Optional, Union, Any, Tuple
+
+
+# schema.sql lives at the project root, next to the package directory
+_SCHEMA_PATH = Path(__file__).resolve().parent.parent / "schema.sql"
+
+# Version recorded in PRAGMA user_version once _init_db has migrated and analyzed
+_SCHEMA_VERSION = 1
+
+# Rows per multi-row INSERT; keeps the bound parameters under the 999 allowed
+# by SQLite builds older than 3.32
+_BULK_INSERT_ROWS = 100
+
+# Rows fetched per connection checkout while streaming an export
+_EXPORT_BATCH_ROWS = 500
+
+
+@functools.lru_cache(maxsize=1)
+def _load_schema() -> str:
+    """Read the SQL schema, caching it for the lifetime of the process.
+    
+    Falls back to ``schema.sql`` in the current working directory when the file
+    is not found next to the package.
+    
+    Returns:
+        str: The contents of schema.sql.
+    
+    Raises:
+        FileNotFoundError: If schema.sql is not found in either location.
+    """
+    try:
+        return _SCHEMA_PATH.read_text()
+    except FileNotFoundError:
+        return Path("schema.sql").read_text()
+
+
+# Statements run from more than one method, defined once so every caller
+# shares the same entry in the connection's prepared-statement cache
+_INSERT_DOCUMENT_SQL = """
+    INSERT OR IGNORE INTO documents (filename, file_hash)
+    VALUES (?, ?)
+"""
+_LINK_DOCUMENT_SQL = """
+    INSERT OR IGNORE INTO story_documents (story_id, document_id)
+    VALUES (?, ?)
+"""
+
+
+@functools.lru_cache(maxsize=8)
+def _insert_stories_sql(rows: int) -> str:
+    """Build the INSERT statement for a given number of stories.
+    
+    Args:
+        rows: Number of stories inserted by the statement.
+    
+    Returns:
+        str: A multi-row INSERT into ``stories`` with nine parameters per row.
+    """
+    values = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?)"] * rows)
+    return f"""
+        INSERT INTO stories (
+            prompt, response, system_prompt, style, mode, memory_added,
+            response_length, word_count, paragraph_count
+        )
+        VALUES {values}
+    """
+
+
+def _response_stats(response: str) -> Tuple[int, int, int]:
+    """Compute the length, word count and paragraph count of a story response.
+    
+    Args:
+        response: The generated story text.
+    
+    Returns:
+        Tuple[int, int, int]: Character length, word count and paragraph count.
+    """
+    return len(response), len(response.split()), response.count('\n\n') + 1
+
+
+class ConnectionPool:
+    """Thread-safe pool of reusable SQLite connections.
+    
+    Connections are opened once up front and handed out through ``acquire``, so
+    repeated queries reuse a warm connection (and its page cache) instead of
+    reopening the database file on every call.
+    
+    Attributes:
+        db_path (str): Path to the SQLite database file.
+        size (int): Number of connections held by the pool.
+        read_only (bool): Whether connections reject writes (``query_only``).
+        cached_statements (int): Size of each connection's prepared-statement cache.
+        acquire_timeout (float): Seconds ``acquire`` waits for a free connection.
+    """
+    
+    cached_statements: int = 128
+    acquire_timeout: float = 30.0
+    
+    def __init__(
+        self,
+        db_path: str,
+        min_connections: int = 4,
+        read_only: bool = False
+    ) -> None:
+        """Initialize the pool and open its connections.
+        
+        Args:
+            db_path: Path to the SQLite database file.
+            min_connections: Number of connections to pre-open. Defaults to 4.
+            read_only: Open connections with ``PRAGMA query_only`` so they can
+                only serve reads. Defaults to False.
+        """
+        self.db_path = db_path
+        self.size = min_connections
+        self.read_only = read_only
+        self._connections: queue.Queue[sqlite3.Connection] = queue.Queue(
+            maxsize=min_connections
+        )
+        for _ in range(min_connections):
+            self._connections.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection with the pool's PRAGMA settings applied.
+        
+        Returns:
+            sqlite3.Connection: A configured database connection.
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            uri=self.db_path.startswith("file:")
+        )
+        conn.row_factory = sqlite3.Row
+        if self.read_only:
+            conn.execute("PRAGMA query_only=TRUE")
+        else:
+            # WAL is persistent in the database file, so readers inherit it
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-32000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def acquire(self) -> Iterator[sqlite3.Connection]:
+        """Check a connection out of the pool for the duration of a block.
+        
+        The block runs inside the connection's transaction context: changes are
+        committed on success and rolled back if an exception is raised. The
+        connection is returned to the pool afterwards either way.
+        
+        Yields:
+            sqlite3.Connection: A pooled database connection.
+        
+        Raises:
+            sqlite3.OperationalError: If no connection is returned to the pool
+                within ``acquire_timeout`` seconds.
+        """
+        try:
+            conn = self._connections.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"No pooled connection to {self.db_path} became free within "
+                f"{self.acquire_timeout} seconds"
+            ) from None
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._connections.put(conn)
+
+    def close(self) -> None:
+        """Close every connection currently held by the pool."""
+        while True:
+            try:
+                conn = self._connections.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
 
 class DatabaseManager:
     """Manages the SQLite database for story and document storage.
     
     This class handles all database operations including story and document storage,
-    retrieval, and analytics.
+    retrieval, and analytics. Writes go through a single writer connection while
+    reads are served from a pool of read-only connections, which WAL mode lets
+    run alongside the writer.
     
     Attributes:
         db_path (str): Path to the SQLite database file.
@@ -22,26 +211,140 @@ class DatabaseManager:
         """Initialize the database manager.
         
         Args:
-            db_path: Path to the SQLite database file. Defaults to "stories.db".
+            db_path: Path to the SQLite database file, ":memory:" for a
+                private in-memory database, or a "file:" URI (e.g. a
+                ``mode=memory&cache=shared`` database that other connections
+                can open too). Defaults to "stories.db".
         """
         self.db_path = db_path
+        self._local = threading.local()
+        self._writer = ConnectionPool(db_path, min_connections=1)
+        if db_path == ":memory:":
+            # Every connection to ":memory:" opens its own private database,
+            # so reads have to go through the writer's connection
+            self._readers = self._writer
+        else:
+            self._readers = ConnectionPool(db_path, read_only=True)
         self._init_db()
 
+    def close(self) -> None:
+        """Close all pooled database connections."""
+        self._readers.close()
+        self._writer.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Run several writes in a single transaction.
+        
+        Writes made by this thread inside the block share the writer connection
+        and are committed together when the block exits, or rolled back if it
+        raises. Reads inside the block don't see the uncommitted writes unless
+        the database is in memory.
+        
+        Yields:
+            None
+        """
+        if getattr(self._local, "conn", None) is not None:
+            # Already inside a transaction; join it
+            yield
+            return
+        with self._writer.acquire() as conn:
+            self._local.conn = conn
+            try:
+                yield
+            finally:
+                self._local.conn = None
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Get the connection to write through.
+        
+        Inside ``transaction()`` this is the transaction's connection; otherwise
+        a writer connection whose changes commit when the block exits.
+        
+        Yields:
+            sqlite3.Connection: A connection that accepts writes.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        with self._writer.acquire() as conn:
+            yield conn
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """Get a connection to read through.
+        
+        In-memory databases share the writer's single connection, which is
+        already checked out inside ``transaction()``, so reads there reuse it.
+        
+        Yields:
+            sqlite3.Connection: A connection for queries.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._readers is self._writer:
+            yield conn
+            return
+        with self._readers.acquire() as conn:
+            yield conn
+
     def _init_db(self) -> None:
         """Initialize the database with the schema.
         
         Reads and executes the SQL schema from schema.sql to create the necessary
-        tables if they don't exist.
+        tables, indexes and full-text index if they don't exist. Databases whose
+        ``PRAGMA user_version`` predates ``_SCHEMA_VERSION`` are then migrated
+        and get one ANALYZE, so the planner picks up the newly created indexes
+        without re-sampling the tables on every start.
         
         Raises:
             FileNotFoundError: If schema.sql is not found.
             sqlite3.Error: If there's an error executing the schema.
         """
-        with open('schema.sql', 'r') as f:
-            schema = f.read()
+        schema = _load_schema()
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._writer.acquire() as conn:
+            fts_exists = conn.execute("""
+                SELECT 1 FROM sqlite_master
+                WHERE type = 'table' AND name = 'stories_fts'
+            """).fetchone() is not None
             conn.executescript(schema)
+            if not fts_exists:
+                # Index stories written before the full-text table existed
+                conn.execute("INSERT INTO stories_fts (stories_fts) VALUES ('rebuild')")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+                self._migrate_response_stats(conn)
+                # Bound the sampling so ANALYZE stays cheap on large databases
+                conn.execute("PRAGMA analysis_limit=400")
+                conn.execute("ANALYZE")
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    def _migrate_response_stats(self, conn: sqlite3.Connection) -> None:
+        """Add and backfill the precomputed response statistic columns.
+        
+        Databases created before these columns existed keep their old ``stories``
+        table, since the schema only uses ``CREATE TABLE IF NOT EXISTS``. Only
+        called by ``_init_db`` while ``PRAGMA user_version`` is below
+        ``_SCHEMA_VERSION``, so the backfill scan runs once per database rather
+        than on every start.
+        
+        Args:
+            conn: Writer connection to migrate through.
+        """
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(stories)")}
+        for column in ("response_length", "word_count", "paragraph_count"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE stories ADD COLUMN {column} INTEGER")
+        
+        rows = conn.execute(
+            "SELECT id, response FROM stories WHERE response_length IS NULL"
+        ).fetchall()
+        conn.executemany("""
+            UPDATE stories
+            SET response_length = ?, word_count = ?, paragraph_count = ?
+            WHERE id = ?
+        """, [(*_response_stats(row["response"]), row["id"]) for row in rows])
 
     def add_story(
         self,
@@ -65,30 +368,52 @@ class DatabaseManager:
         Returns:
             int: The ID of the newly inserted story.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO stories (prompt, response, system_prompt, style, mode, memory_added)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (prompt, response, system_prompt, style, mode, memory_added))
+        with self._write() as conn:
+            cursor = conn.execute(_insert_stories_sql(1), (
+                prompt, response, system_prompt, style, mode, memory_added,
+                *_response_stats(response)
+            ))
             return cursor.lastrowid
 
+    def add_stories_bulk(self, stories: List[Dict[str, Any]]) -> None:
+        """Add several stories to the database in a single transaction.
+        
+        Rows are inserted ``_BULK_INSERT_ROWS`` at a time with multi-row
+        ``VALUES`` statements, so SQLite parses and steps one statement per
+        batch rather than one per story.
+        
+        Args:
+            stories: Story records, each with the keyword arguments accepted by
+                ``add_story`` (``prompt`` and ``response`` are required).
+        """
+        rows = [
+            (
+                story["prompt"], story["response"], story.get("system_prompt"),
+                story.get("style"), story.get("mode"), story.get("memory_added", False),
+                *_response_stats(story["response"])
+            )
+            for story in stories
+        ]
+        with self._write() as conn:
+            for start in range(0, len(rows), _BULK_INSERT_ROWS):
+                batch = rows[start:start + _BULK_INSERT_ROWS]
+                conn.execute(
+                    _insert_stories_sql(len(batch)),
+                    [value for row in batch for value in row]
+                )
+
     def add_document(self, filename: str, file_hash: str) -> int:
         """Add a new document to the database.
         
         Args:
             filename: Name of the document file.
-            file_hash: MD5 hash of the document content.
+            file_hash: Content hash of the document.
         
         Returns:
             int: The ID of the newly inserted document.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR IGNORE INTO documents (filename, file_hash)
-                VALUES (?, ?)
-            """, (filename, file_hash))
+        with self._write() as conn:
+            cursor = conn.execute(_INSERT_DOCUMENT_SQL, (filename, file_hash))
             return cursor.lastrowid
 
     def link_story_to_document(self, story_id: int, document_id: int) -> None:
@@ -98,28 +423,72 @@ class DatabaseManager:
             story_id: ID of the story to link.
             document_id: ID of the document to link.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR IGNORE INTO story_documents (story_id, document_id)
-                VALUES (?, ?)
-            """, (story_id, document_id))
-
-    def get_story(self, story_id: int) -> Optional[Tuple]:
+        with self._write() as conn:
+            conn.execute(_LINK_DOCUMENT_SQL, (story_id, document_id))
+
+    def add_documents_bulk(self, items: List[Tuple[str, str]]) -> List[int]:
+        """Add several documents to the database in a single transaction.
+        
+        Documents that are already stored (same filename and hash) are left
+        untouched and their existing IDs are returned.
+        
+        Args:
+            items: List of (filename, file_hash) pairs.
+        
+        Returns:
+            List[int]: Document IDs, in the same order as ``items``.
+        """
+        with self._write() as conn:
+            conn.executemany(_INSERT_DOCUMENT_SQL, items)
+            return [
+                conn.execute(
+                    "SELECT id FROM documents WHERE filename = ? AND file_hash = ?",
+                    item
+                ).fetchone()[0]
+                for item in items
+            ]
+
+    def link_story_to_documents(self, story_id: int, document_ids: List[int]) -> None:
+        """Link a story to several documents in a single transaction.
+        
+        Args:
+            story_id: ID of the story to link.
+            document_ids: IDs of the documents to link.
+        """
+        with self._write() as conn:
+            conn.executemany(
+                _LINK_DOCUMENT_SQL,
+                [(story_id, document_id) for document_id in document_ids]
+            )
+
+    def get_story(self, story_id: int) -> Optional[sqlite3.Row]:
         """Get a story by ID.
         
         Args:
             story_id: ID of the story to retrieve.
         
         Returns:
-            Optional[Tuple]: Story data as a tuple, or None if not found.
+            Optional[sqlite3.Row]: Story row, or None if not found.
+        """
+        with self._read() as conn:
+            return conn.execute(
+                "SELECT * FROM stories WHERE id = ?", (story_id,)
+            ).fetchone()
+
+    def get_max_story_id(self) -> int:
+        """Get the highest story ID.
+        
+        This is a cheap primary-key lookup that changes whenever a story is added,
+        so callers can use it as a version token for cached story data.
+        
+        Returns:
+            int: The highest story ID, or 0 if there are no stories.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM stories WHERE id = ?", (story_id,))
-            return cursor.fetchone()
+        with self._read() as conn:
+            row = conn.execute("SELECT COALESCE(MAX(id), 0) FROM stories").fetchone()
+            return row[0]
 
-    def get_all_stories(self, limit: int = 100, offset: int = 0) -> List[Tuple]:
+    def get_all_stories(self, limit: int = 100, offset: int = 0) -> List[sqlite3.Row]:
         """Get all stories with pagination.
         
         Args:
@@ -127,18 +496,21 @@ class DatabaseManager:
             offset: Number of stories to skip.
         
         Returns:
-            List[Tuple]: List of story data tuples.
+            List[sqlite3.Row]: List of story rows.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        with self._read() as conn:
+            return conn.execute("""
                 SELECT * FROM stories 
-                ORDER BY created_at DESC 
+                ORDER BY id DESC 
                 LIMIT ? OFFSET ?
-            """, (limit, offset))
-            return cursor.fetchall()
+            """, (limit, offset)).fetchall()
 
-    def get_stories_by_style(self, style: str, limit: int = 100, offset: int = 0) -> List[Tuple]:
+    def get_stories_by_style(
+        self,
+        style: str,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[sqlite3.Row]:
         """Get stories by style.
         
         Args:
@@ -147,56 +519,93 @@ class DatabaseManager:
             offset: Number of stories to skip.
         
         Returns:
-            List[Tuple]: List of story data tuples.
+            List[sqlite3.Row]: List of story rows.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        with self._read() as conn:
+            return conn.execute("""
                 SELECT * FROM stories 
                 WHERE style = ? 
-                ORDER BY created_at DESC 
+                ORDER BY id DESC 
                 LIMIT ? OFFSET ?
-            """, (style, limit, offset))
-            return cursor.fetchall()
+            """, (style, limit, offset)).fetchall()
 
-    def get_story_documents(self, story_id: int) -> List[Tuple]:
+    def get_story_documents(self, story_id: int) -> List[sqlite3.Row]:
         """Get all documents linked to a story.
         
         Args:
             story_id: ID of the story to get documents for.
         
         Returns:
-            List[Tuple]: List of document data tuples.
+            List[sqlite3.Row]: List of document rows.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        with self._read() as conn:
+            return conn.execute("""
                 SELECT d.* FROM documents d
                 JOIN story_documents sd ON d.id = sd.document_id
                 WHERE sd.story_id = ?
-            """, (story_id,))
-            return cursor.fetchall()
+            """, (story_id,)).fetchall()
+
+    def get_documents_for_stories(
+        self,
+        story_ids: List[int]
+    ) -> Dict[int, List[sqlite3.Row]]:
+        """Get the documents linked to each of several stories in one query.
+        
+        Args:
+            story_ids: IDs of the stories to get documents for.
+        
+        Returns:
+            Dict[int, List[sqlite3.Row]]: Document rows grouped by story ID. Stories
+                without linked documents are omitted.
+        """
+        if not story_ids:
+            return {}
+        placeholders = ",".join("?" * len(story_ids))
+        documents: Dict[int, List[sqlite3.Row]] = {}
+        with self._read() as conn:
+            cursor = conn.execute(f"""
+                SELECT sd.story_id, d.* FROM story_documents sd
+                JOIN documents d ON d.id = sd.document_id
+                WHERE sd.story_id IN ({placeholders})
+            """, story_ids)
+            for row in cursor:
+                documents.setdefault(row["story_id"], []).append(row)
+        return documents
 
-    def search_stories(self, query: str, limit: int = 100, offset: int = 0) -> List[Tuple]:
+    def search_stories(
+        self,
+        query: str,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[sqlite3.Row]:
         """Search stories by prompt or response content.
         
+        Uses the ``stories_fts`` full-text index, so the query is matched against
+        tokens rather than arbitrary substrings. The query is searched as a
+        single quoted phrase, so FTS5 operators in it are treated as text, and
+        its last word is matched as a prefix so partially typed words still
+        find results. An empty query matches every story.
+        
         Args:
             query: Search query string.
             limit: Maximum number of stories to return.
             offset: Number of stories to skip.
         
         Returns:
-            List[Tuple]: List of matching story data tuples.
+            List[sqlite3.Row]: List of matching story rows.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM stories 
-                WHERE prompt LIKE ? OR response LIKE ?
-                ORDER BY created_at DESC 
+        if not query.strip():
+            # An empty phrase matches nothing in FTS5; keep the LIKE '%%' behaviour
+            return self.get_all_stories(limit=limit, offset=offset)
+        with self._read() as conn:
+            phrase = '"' + query.replace('"', '""') + '"*'
+            return conn.execute("""
+                SELECT s.* FROM stories s
+                JOIN stories_fts f ON f.rowid = s.id
+                WHERE stories_fts MATCH ?
+                ORDER BY s.id DESC 
                 LIMIT ? OFFSET ?
-            """, (f'%{query}%', f'%{query}%', limit, offset))
-            return cursor.fetchall()
+            """, (phrase, limit, offset)).fetchall()
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics.
@@ -204,21 +613,20 @@ class DatabaseManager:
         Returns:
             Dict[str, Any]: Dictionary containing basic database statistics.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._read() as conn:
             stats = {}
             
-            # Total stories
-            cursor.execute("SELECT COUNT(*) FROM stories")
-            stats['total_stories'] = cursor.fetchone()[0]
+            # Total stories and documents in a single round-trip
+            cursor = conn.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM stories),
+                    (SELECT COUNT(*) FROM documents)
+            """)
+            stats['total_stories'], stats['total_documents'] = cursor.fetchone()
             
             # Stories by style
-            cursor.execute("SELECT style, COUNT(*) FROM stories GROUP BY style")
-            stats['stories_by_style'] = dict(cursor.fetchall())
-            
-            # Total documents
-            cursor.execute("SELECT COUNT(*) FROM documents")
-            stats['total_documents'] = cursor.fetchone()[0]
+            cursor = conn.execute("SELECT style, COUNT(*) FROM stories GROUP BY style")
+            stats['stories_by_style'] = {row[0]: row[1] for row in cursor}
             
             return stats
 
@@ -226,7 +634,8 @@ class DatabaseManager:
         """Get enhanced database statistics.
         
         Returns:
-            Dict[str, Any]: Dictionary containing detailed database statistics including:
+            Dict[str, Any]: Dictionary containing detailed database statistics
+                including:
                 - Basic counts (total stories, documents)
                 - Stories by style and mode
                 - Memory usage statistics
@@ -234,50 +643,53 @@ class DatabaseManager:
                 - Response length statistics
                 - Document usage statistics
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._read() as conn:
             stats = {}
             
-            # Basic stats
-            cursor.execute("SELECT COUNT(*) FROM stories")
-            stats['total_stories'] = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM documents")
-            stats['total_documents'] = cursor.fetchone()[0]
+            # Scalar aggregates in a single round-trip
+            cursor = conn.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM stories),
+                    (SELECT COUNT(*) FROM documents),
+                    (SELECT COUNT(*) FROM stories WHERE memory_added = 1),
+                    (SELECT AVG(response_length) FROM stories)
+            """)
+            (
+                stats['total_stories'],
+                stats['total_documents'],
+                stats['stories_in_memory'],
+                avg_response_length
+            ) = cursor.fetchone()
+            stats['avg_response_length'] = int(avg_response_length or 0)
             
             # Stories by style
-            cursor.execute("SELECT style, COUNT(*) FROM stories GROUP BY style")
-            stats['stories_by_style'] = dict(cursor.fetchall())
+            cursor = conn.execute("SELECT style, COUNT(*) FROM stories GROUP BY style")
+            stats['stories_by_style'] = {row[0]: row[1] for row in cursor}
             
             # Stories by mode
-            cursor.execute("SELECT mode, COUNT(*) FROM stories GROUP BY mode")
-            stats['stories_by_mode'] = dict(cursor.fetchall())
-            
-            # Memory usage
-            cursor.execute("SELECT COUNT(*) FROM stories WHERE memory_added = 1")
-            stats['stories_in_memory'] = cursor.fetchone()[0]
-            
-            # Time-based statistics
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as count,
-                    strftime('%Y-%m-%d', created_at) as date
-                FROM stories 
-                GROUP BY date 
-                ORDER BY date DESC 
-                LIMIT 7
-            """)
-            stats['stories_last_7_days'] = dict(cursor.fetchall())
+            cursor = conn.execute("SELECT mode, COUNT(*) FROM stories GROUP BY mode")
+            stats['stories_by_mode'] = {row[0]: row[1] for row in cursor}
             
-            # Average response length
-            cursor.execute("""
-                SELECT AVG(length(response)) 
-                FROM stories
+            # Time-based statistics: one range count per day over the created_at
+            # index, so only the last week's rows are visited
+            cursor = conn.execute("""
+                WITH RECURSIVE days(day) AS (
+                    SELECT date('now', '-6 days')
+                    UNION ALL
+                    SELECT date(day, '+1 day') FROM days WHERE day < date('now')
+                )
+                SELECT
+                    day,
+                    (
+                        SELECT COUNT(*) FROM stories
+                        WHERE created_at >= day AND created_at < date(day, '+1 day')
+                    )
+                FROM days
             """)
-            stats['avg_response_length'] = int(cursor.fetchone()[0] or 0)
+            stats['stories_last_7_days'] = {row[0]: row[1] for row in cursor}
             
             # Most used documents
-            cursor.execute("""
+            cursor = conn.execute("""
                 SELECT d.filename, COUNT(*) as usage_count
                 FROM documents d
                 JOIN story_documents sd ON d.id = sd.document_id
@@ -285,42 +697,75 @@ class DatabaseManager:
                 ORDER BY usage_count DESC
                 LIMIT 5
             """)
-            stats['most_used_documents'] = dict(cursor.fetchall())
+            stats['most_used_documents'] = {row[0]: row[1] for row in cursor}
             
             return stats
 
-    def export_all_stories(self, format: str = "json") -> Union[List[Dict[str, Any]], List[Tuple]]:
+    def export_all_stories(
+        self,
+        format: str = "json"
+    ) -> Union[Iterator[Dict[str, Any]], Iterator[sqlite3.Row]]:
         """Export all stories in the specified format.
         
+        Stories are streamed from the database in batches rather than loaded all
+        at once. The reader connection is returned to the pool between batches,
+        so a partly consumed export doesn't hold it.
+        
         Args:
             format: Export format, either "json" or "csv".
         
         Returns:
-            Union[List[Dict[str, Any]], List[Tuple]]: Exported stories in the specified format.
+            Union[Iterator[Dict[str, Any]], Iterator[sqlite3.Row]]: Exported stories
+            in the specified format, as dicts for "json" and rows for "csv".
         
         Raises:
             ValueError: If the format is not supported.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM stories ORDER BY created_at DESC")
-            stories = cursor.fetchall()
-            
-            if format == "json":
-                return [{
-                    "id": story[0],
-                    "prompt": story[1],
-                    "response": story[2],
-                    "system_prompt": story[3],
-                    "style": story[4],
-                    "created_at": story[5],
-                    "mode": story[6],
-                    "memory_added": bool(story[7])
-                } for story in stories]
-            elif format == "csv":
-                return stories
-            else:
-                raise ValueError(f"Unsupported format: {format}")
+        if format == "json":
+            return self._iter_story_dicts()
+        elif format == "csv":
+            return self._iter_story_rows()
+        else:
+            raise ValueError(f"Unsupported format: {format}")
+
+    def _iter_story_rows(self) -> Iterator[sqlite3.Row]:
+        """Stream every story row, newest first.
+        
+        Rows are fetched ``_EXPORT_BATCH_ROWS`` at a time, paging on the id so
+        each batch is a rowid range scan, and the connection is released before
+        the batch is yielded.
+        
+        Yields:
+            sqlite3.Row: Story rows.
+        """
+        last_id = 2**63 - 1  # Largest SQLite rowid
+        while True:
+            with self._read() as conn:
+                # The precomputed statistic columns are internal, so exports keep
+                # their original format
+                rows = conn.execute("""
+                    SELECT id, prompt, response, system_prompt, style, created_at,
+                           mode, memory_added
+                    FROM stories
+                    WHERE id < ?
+                    ORDER BY id DESC
+                    LIMIT ?
+                """, (last_id, _EXPORT_BATCH_ROWS)).fetchall()
+            yield from rows
+            if len(rows) < _EXPORT_BATCH_ROWS:
+                return
+            last_id = rows[-1]["id"]
+
+    def _iter_story_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Stream every story as a JSON-serializable dict, newest first.
+        
+        Yields:
+            Dict[str, Any]: Story data keyed by column name.
+        """
+        for row in self._iter_story_rows():
+            story = {key: row[key] for key in row.keys()}
+            story["memory_added"] = bool(story["memory_added"])
+            yield story
 
     def get_story_analytics(self, story_id: int) -> Optional[Dict[str, Any]]:
         """Get detailed analytics for a specific story.
@@ -335,43 +780,46 @@ class DatabaseManager:
                 - Used documents
                 None if story not found.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._read() as conn:
             analytics = {}
             
             # Get story details
-            cursor.execute("SELECT * FROM stories WHERE id = ?", (story_id,))
+            cursor = conn.execute("""
+                SELECT id, prompt, response, system_prompt, style, created_at, mode,
+                       memory_added, response_length, word_count, paragraph_count
+                FROM stories WHERE id = ?
+            """, (story_id,))
             story = cursor.fetchone()
             if not story:
                 return None
                 
             analytics['story'] = {
-                "id": story[0],
-                "prompt": story[1],
-                "response": story[2],
-                "system_prompt": story[3],
-                "style": story[4],
-                "created_at": story[5],
-                "mode": story[6],
-                "memory_added": bool(story[7])
+                "id": story["id"],
+                "prompt": story["prompt"],
+                "response": story["response"],
+                "system_prompt": story["system_prompt"],
+                "style": story["style"],
+                "created_at": story["created_at"],
+                "mode": story["mode"],
+                "memory_added": bool(story["memory_added"])
             }
             
-            # Get response statistics
+            # Response statistics are precomputed when the story is stored
             analytics['response_stats'] = {
-                "length": len(story[2]),
-                "word_count": len(story[2].split()),
-                "paragraph_count": len(story[2].split('\n\n'))
+                "length": story["response_length"],
+                "word_count": story["word_count"],
+                "paragraph_count": story["paragraph_count"]
             }
             
             # Get document usage
-            cursor.execute("""
+            cursor = conn.execute("""
                 SELECT d.filename, d.created_at
                 FROM documents d
                 JOIN story_documents sd ON d.id = sd.document_id
                 WHERE sd.story_id = ?
             """, (story_id,))
             analytics['used_documents'] = [
-                {"filename": doc[0], "created_at": doc[1]}
+                {"filename": doc["filename"], "created_at": doc["created_at"]}
                 for doc in cursor.fetchall()
             ]
             
@@ -6,6 +6,7 @@ including story generation, browsing, and analytics features.
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from plotly.graph_objects import Figure
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import os
@@ -15,14 +16,116 @@ from llm_story_generator.story_browser import story_browser
 from llm_story_generator.story_generator import (
     STORY_STYLES,
     generate_story,
-    store_story_to_memory,
+    memory_story_path,
     append_to_index
 )
-from llm_story_generator.config import DOCS_PATH, MEMORY_STORIES_PATH
+from llm_story_generator.config import DOCS_PATH, ensure_directories_once
 from langchain.docstore.document import Document
 
+@st.cache_resource(show_spinner=False)
+def _get_db() -> DatabaseManager:
+    """Create the database manager shared by every session and rerun.
+    
+    Streamlit re-runs this script on every interaction; caching the manager
+    keeps its connection pool, and their page caches, alive between reruns
+    instead of reopening the database and re-running the schema each time.
+    
+    Returns:
+        DatabaseManager: The process-wide database manager.
+    """
+    return DatabaseManager()
+
 # Initialize database
-db = DatabaseManager()
+db = _get_db()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_analytics() -> Dict[str, Any]:
+    """Load the statistics shown on the analytics dashboard.
+    
+    The result is cached for a minute so widget interactions don't re-run the
+    aggregate queries on every Streamlit rerun.
+    
+    Returns:
+        Dict[str, Any]: Enhanced statistics from the database manager.
+    """
+    return db.get_enhanced_statistics()
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _style_fig(stories_by_style: Dict[str, int]) -> Figure:
+    """Build the pie chart of stories by style.
+    
+    Args:
+        stories_by_style: Mapping of story style to story count.
+    
+    Returns:
+        Figure: Plotly pie chart.
+    """
+    return px.pie(
+        names=list(stories_by_style.keys()),
+        values=list(stories_by_style.values()),
+        title='Story Distribution by Style'
+    )
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _mode_fig(stories_by_mode: Dict[str, int]) -> Figure:
+    """Build the bar chart of stories by generation mode.
+    
+    Args:
+        stories_by_mode: Mapping of generation mode to story count.
+    
+    Returns:
+        Figure: Plotly bar chart.
+    """
+    return px.bar(
+        x=list(stories_by_mode.keys()),
+        y=list(stories_by_mode.values()),
+        labels={'x': 'Mode', 'y': 'Count'},
+        title='Story Distribution by Mode'
+    )
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _days_fig(stories_last_7_days: Dict[str, int]) -> Figure:
+    """Build the line chart of recent story generation activity.
+    
+    Args:
+        stories_last_7_days: Mapping of day to story count.
+    
+    Returns:
+        Figure: Plotly line chart.
+    """
+    return px.line(
+        x=list(stories_last_7_days.keys()),
+        y=list(stories_last_7_days.values()),
+        labels={'x': 'Date', 'y': 'Count'},
+        title='Story Generation Activity'
+    )
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _list_docs(root_mtime_ns: int) -> List[str]:
+    """List the documents available under DOCS_PATH.
+    
+    Walks the tree with ``os.scandir`` so file names and types come straight from
+    the directory entries without extra stat calls.
+    
+    Args:
+        root_mtime_ns: Modification time of DOCS_PATH. Only used as part of the
+            cache key so that adding or removing files invalidates the listing.
+    
+    Returns:
+        List[str]: Document paths relative to DOCS_PATH.
+    """
+    all_docs: List[str] = []
+    pending = [(DOCS_PATH, "")]
+    while pending:
+        directory, prefix = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                rel_path = os.path.join(prefix, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, rel_path))
+                elif entry.name.endswith((".txt", ".pdf", ".docx")):
+                    all_docs.append(rel_path)
+    return all_docs
 
 def show_analytics() -> None:
     """Display the analytics dashboard.
@@ -43,7 +146,7 @@ def show_analytics() -> None:
     """
     st.title("📊 Analytics Dashboard")
     
-    stats = db.get_enhanced_statistics()
+    stats = _load_analytics()
     
     # Basic statistics
     col1, col2, col3 = st.columns(3)
@@ -56,37 +159,22 @@ def show_analytics() -> None:
     
     # Stories by style
     st.subheader("Stories by Style")
-    style_df = pd.DataFrame({
-        'Style': list(stats['stories_by_style'].keys()),
-        'Count': list(stats['stories_by_style'].values())
-    })
-    fig = px.pie(style_df, values='Count', names='Style', title='Story Distribution by Style')
-    st.plotly_chart(fig)
+    st.plotly_chart(_style_fig(stats['stories_by_style']))
     
     # Stories by mode
     st.subheader("Stories by Mode")
-    mode_df = pd.DataFrame({
-        'Mode': list(stats['stories_by_mode'].keys()),
-        'Count': list(stats['stories_by_mode'].values())
-    })
-    fig = px.bar(mode_df, x='Mode', y='Count', title='Story Distribution by Mode')
-    st.plotly_chart(fig)
+    st.plotly_chart(_mode_fig(stats['stories_by_mode']))
     
     # Last 7 days activity
     st.subheader("Last 7 Days Activity")
-    days_df = pd.DataFrame({
-        'Date': list(stats['stories_last_7_days'].keys()),
-        'Count': list(stats['stories_last_7_days'].values())
-    })
-    fig = px.line(days_df, x='Date', y='Count', title='Story Generation Activity')
-    st.plotly_chart(fig)
+    st.plotly_chart(_days_fig(stats['stories_last_7_days']))
     
     # Most used documents
     st.subheader("Most Used Documents")
-    docs_df = pd.DataFrame({
-        'Document': list(stats['most_used_documents'].keys()),
-        'Usage Count': list(stats['most_used_documents'].values())
-    })
+    docs_df = pd.DataFrame(
+        list(stats['most_used_documents'].items()),
+        columns=['Document', 'Usage Count']
+    )
     st.dataframe(docs_df)
 
 def story_generator_ui() -> None:
@@ -121,12 +209,7 @@ def story_generator_ui() -> None:
     mode = st.radio("Select generation mode:", ["Direct Generation", "RAG with Documents"])
     
     # Get available documents
-    all_docs: List[str] = []
-    for root, _, files in os.walk(DOCS_PATH):
-        for file in files:
-            if file.endswith((".txt", ".pdf", ".docx")):
-                rel_path = os.path.relpath(os.path.join(root, file), DOCS_PATH)
-                all_docs.append(rel_path)
+    all_docs = _list_docs(os.stat(DOCS_PATH).st_mtime_ns)
     
     selected: List[str] = []
     if mode == "RAG with Documents":
@@ -146,10 +229,15 @@ def story_generator_ui() -> None:
                     selected=selected,
                     db_manager=db
                 )
+                # A new story was stored, so cached analytics are stale
+                _load_analytics.clear()
 
                 if add_to_memory:
-                    story_path = store_story_to_memory(answer, now)
-                    story_doc = Document(page_content=answer, metadata={"source": story_path})
+                    # generate_story already writes the story file in the background
+                    story_doc = Document(
+                        page_content=answer,
+                        metadata={"source": memory_story_path(now)}
+                    )
                     append_to_index([story_doc])
 
                 st.markdown(f"**🧙 Story Generated:**\n\n{answer}")
@@ -172,6 +260,7 @@ def main() -> None:
     - Story Browser
     - Analytics
     """
+    ensure_directories_once()
     st.set_page_config(page_title="Qwen RAG", layout="wide")
     
     # Add navigation
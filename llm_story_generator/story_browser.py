@@ -6,19 +6,24 @@ through a Streamlit interface.
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+import csv
+import io
 import json
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Mapping
 
 from .db_manager import DatabaseManager
 
-def format_story(story: Tuple) -> Dict[str, Any]:
+# Shortest search query run against the full-text index
+_MIN_SEARCH_LENGTH = 2
+
+def format_story(story: Mapping[str, Any]) -> Dict[str, Any]:
     """Format a story record for display.
     
-    This function converts a raw story tuple from the database into a
+    This function converts a raw story record from the database into a
     human-readable dictionary with formatted values.
     
     Args:
-        story: Story record tuple from the database containing:
+        story: Story record from the database, accessed by column name:
             - id: Story ID
             - prompt: User's input prompt
             - response: Generated story text
@@ -33,16 +38,77 @@ def format_story(story: Tuple) -> Dict[str, Any]:
         including formatted timestamps and boolean indicators.
     """
     return {
-        "ID": story[0],
-        "Prompt": story[1],
-        "Response": story[2],
-        "System Prompt": story[3],
-        "Style": story[4],
-        "Created At": datetime.fromisoformat(story[5]).strftime("%Y-%m-%d %H:%M:%S"),
-        "Mode": story[6],
-        "Memory Added": "Yes" if story[7] else "No"
+        "ID": story["id"],
+        "Prompt": story["prompt"],
+        "Response": story["response"],
+        "System Prompt": story["system_prompt"],
+        "Style": story["style"],
+        "Created At": datetime.fromisoformat(story["created_at"]).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        ),
+        "Mode": story["mode"],
+        "Memory Added": "Yes" if story["memory_added"] else "No"
     }
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _style_list(_db_manager: DatabaseManager, version: int) -> List[str]:
+    """Get the story styles for the style filter dropdown.
+    
+    Args:
+        _db_manager: Database manager instance (excluded from the cache key).
+        version: Story version token; a new value invalidates the cached list.
+    
+    Returns:
+        List[str]: Distinct story styles.
+    """
+    return list(_db_manager.get_statistics()['stories_by_style'].keys())
+
+@st.cache_data(ttl=30, max_entries=256, show_spinner=False)
+def _fetch_stories(
+    _db_manager: DatabaseManager,
+    version: int,
+    search_query: str,
+    style_filter: str,
+    page: int,
+    page_size: int
+) -> List[Dict[str, Any]]:
+    """Fetch one page of stories for the current search and filter settings.
+    
+    Results are memoized per query, filter and page, so repeating a search or
+    paging back and forth reuses the earlier result.
+    
+    Args:
+        _db_manager: Database manager instance (excluded from the cache key).
+        version: Story version token; a new value invalidates cached pages.
+        search_query: Full-text search query, or an empty string for none.
+        style_filter: Style to filter by, or "All".
+        page: 1-based page number.
+        page_size: Number of stories per page.
+    
+    Returns:
+        List[Dict[str, Any]]: Story records keyed by column name, each with a
+            ``documents`` list of linked document filenames.
+    """
+    offset = (page - 1) * page_size
+    if search_query:
+        rows = _db_manager.search_stories(search_query, limit=page_size, offset=offset)
+    elif style_filter != "All":
+        rows = _db_manager.get_stories_by_style(
+            style_filter, limit=page_size, offset=offset
+        )
+    else:
+        rows = _db_manager.get_all_stories(limit=page_size, offset=offset)
+    # Linked documents for the whole page come back in one query
+    documents = _db_manager.get_documents_for_stories([row["id"] for row in rows])
+    # sqlite3.Row can't be pickled into the cache, so store plain dicts
+    return [
+        {
+            **dict(row),
+            "documents": [doc["filename"] for doc in documents.get(row["id"], [])]
+        }
+        for row in rows
+    ]
+
 def story_browser(db_manager: DatabaseManager) -> None:
     """Display the story browser interface.
     
@@ -64,58 +130,83 @@ def story_browser(db_manager: DatabaseManager) -> None:
     with col1:
         search_query = st.text_input("🔍 Search stories", "")
     
+    version = db_manager.get_max_story_id()
     with col2:
         style_filter = st.selectbox(
             "Filter by style",
-            ["All"] + list(db_manager.get_statistics()['stories_by_style'].keys())
+            ["All"] + _style_list(db_manager, version)
         )
     
     # Pagination
     page_size = st.sidebar.slider("Stories per page", 5, 50, 10)
     page = st.sidebar.number_input("Page", 1, 1, 1)
-    offset = (page - 1) * page_size
+    
+    # A single character matches almost everything, so don't search on it yet
+    search_query = search_query.strip()
+    if len(search_query) < _MIN_SEARCH_LENGTH:
+        search_query = ""
     
     # Get stories based on filters
-    if search_query:
-        stories = db_manager.search_stories(search_query, limit=page_size, offset=offset)
-    elif style_filter != "All":
-        stories = db_manager.get_stories_by_style(style_filter, limit=page_size, offset=offset)
-    else:
-        stories = db_manager.get_all_stories(limit=page_size, offset=offset)
+    stories = _fetch_stories(
+        db_manager, version, search_query, style_filter, page, page_size
+    )
     
     if not stories:
         st.info("No stories found matching your criteria.")
         return
     
-    # Display stories
-    for story in stories:
-        formatted_story = format_story(story)
+    # Display the page as a single table; details are shown for the selected row
+    table = pd.DataFrame(
+        stories,
+        columns=["id", "created_at", "style", "mode", "memory_added", "prompt"]
+    )
+    created_at = pd.to_datetime(table["created_at"], format="ISO8601")
+    table["created_at"] = created_at.dt.strftime("%Y-%m-%d %H:%M:%S")
+    table["memory_added"] = (
+        table["memory_added"].astype(bool).map({True: "Yes", False: "No"})
+    )
+    table.columns = ["ID", "Created At", "Style", "Mode", "Memory Added", "Prompt"]
+    event = st.dataframe(
+        table,
+        width="stretch",
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row"
+    )
+    
+    if not event.selection.rows:
+        st.caption("Select a story to see its details.")
+        return
+    
+    story = stories[event.selection.rows[0]]
+    formatted_story = format_story(story)
+    
+    title = f"Story #{formatted_story['ID']} - {formatted_story['Created At']}"
+    with st.expander(title, expanded=True):
+        st.markdown("**Prompt:**")
+        st.write(formatted_story['Prompt'])
+        
+        st.markdown("**Response:**")
+        st.write(formatted_story['Response'])
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.write(f"**Style:** {formatted_story['Style']}")
+        with col2:
+            st.write(f"**Mode:** {formatted_story['Mode']}")
+        with col3:
+            st.write(f"**Memory:** {formatted_story['Memory Added']}")
+        
+        # Show linked documents if any
+        if story["documents"]:
+            st.markdown("**Source Documents:**")
+            for filename in story["documents"]:
+                st.write(f"- {filename}")
         
-        with st.expander(f"Story #{formatted_story['ID']} - {formatted_story['Created At']}"):
-            st.markdown("**Prompt:**")
-            st.write(formatted_story['Prompt'])
-            
-            st.markdown("**Response:**")
-            st.write(formatted_story['Response'])
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.write(f"**Style:** {formatted_story['Style']}")
-            with col2:
-                st.write(f"**Mode:** {formatted_story['Mode']}")
-            with col3:
-                st.write(f"**Memory:** {formatted_story['Memory Added']}")
-            
-            # Show linked documents if any
-            docs = db_manager.get_story_documents(formatted_story['ID'])
-            if docs:
-                st.markdown("**Source Documents:**")
-                for doc in docs:
-                    st.write(f"- {doc[1]}")
-            
-            # Export options
-            if st.button(f"Export Story #{formatted_story['ID']}", key=f"export_{formatted_story['ID']}"):
-                export_story(formatted_story)
+        # Export options
+        story_id = formatted_story['ID']
+        if st.button(f"Export Story #{story_id}", key=f"export_{story_id}"):
+            export_story(formatted_story)
 
 def export_story(story: Dict[str, Any]) -> None:
     """Export a story to various formats.
@@ -137,34 +228,39 @@ def export_story(story: Dict[str, Any]) -> None:
     if export_format == "JSON":
         st.download_button(
             "Download JSON",
-            data=json.dumps(story, indent=2),
+            data=json.dumps(story, ensure_ascii=False).encode("utf-8"),
             file_name=f"story_{story['ID']}.json",
             mime="application/json"
         )
     elif export_format == "TXT":
-        text = f"""Story #{story['ID']}
-Created: {story['Created At']}
-Style: {story['Style']}
-Mode: {story['Mode']}
-Memory Added: {story['Memory Added']}
-
-PROMPT:
-{story['Prompt']}
-
-RESPONSE:
-{story['Response']}
-"""
+        text = "\n".join([
+            f"Story #{story['ID']}",
+            f"Created: {story['Created At']}",
+            f"Style: {story['Style']}",
+            f"Mode: {story['Mode']}",
+            f"Memory Added: {story['Memory Added']}",
+            "",
+            "PROMPT:",
+            story['Prompt'],
+            "",
+            "RESPONSE:",
+            story['Response'],
+            ""
+        ])
         st.download_button(
             "Download TXT",
-            data=text,
+            data=text.encode("utf-8"),
             file_name=f"story_{story['ID']}.txt",
             mime="text/plain"
         )
     elif export_format == "CSV":
-        df = pd.DataFrame([story])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(story.keys())
+        writer.writerow(story.values())
         st.download_button(
             "Download CSV",
-            data=df.to_csv(index=False),
+            data=buffer.getvalue().encode("utf-8"),
             file_name=f"story_{story['ID']}.csv",
             mime="text/csv"
-        ) 
\ No newline at end of file
+        )
@@ -10,13 +10,25 @@ from langchain_community.document_loaders import TextLoader, PyPDFLoader, Docx2t
 from langchain_openai import ChatOpenAI
 from langchain.chains import RetrievalQAWithSourcesChain
 from langchain.schema import Document
-from typing import Dict, List, Optional, Tuple, Any, Union, Final
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Any, Final
 from datetime import datetime
+from types import MappingProxyType
+from concurrent.futures import Future, ThreadPoolExecutor
+import copy
+import functools
+import math
+import mmap
 import os
-import hashlib
 import json
+import tempfile
+import threading
+import uuid
+import blake3
+import faiss
+import openai
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 
 from .config import (
@@ -27,8 +39,8 @@ from .config import (
 
 logger = logging.getLogger(__name__)
 
-# Storytelling style presets
-STORY_STYLES: Final[Dict[str, str]] = {
+# Storytelling style presets, read-only so callers can't alter them at runtime
+STORY_STYLES: Final[Mapping[str, str]] = MappingProxyType({
     "Creative Storyteller": """You are a creative storyteller with a deep understanding of narrative structure and character development. 
 Your task is to generate engaging, immersive stories based on user prompts. 
 When given a scene or prompt:
@@ -78,23 +90,90 @@ Capture the charm, humor, and emotional depth typical of One Piece arcs.
 Avoid using canon characters directly; brief references (e.g., "a pirate known as Straw Hat") are acceptable.
 
 Prioritize creativity, emotional resonance, and narrative immersion. Keep the tone accessible for fans of the anime and manga, with a flair for imaginative action and heartfelt character development."""
-}
+})
+
+# System prompt used when the selected style is unknown
+_DEFAULT_STYLE: Final[str] = STORY_STYLES["Creative Storyteller"]
+
+# Normalized name of the generation mode that skips RAG
+_MODE_DIRECT: Final[str] = "direct generation"
 
 def hash_file(filepath: str) -> str:
-    """Calculate MD5 hash of a file.
+    """Calculate the BLAKE3 hash of a file.
+    
+    The file is memory-mapped and handed to the hasher as a single buffer, so
+    its contents are never copied into a Python bytes object and BLAKE3 can
+    split the work across threads.
     
     Args:
         filepath: Path to the file to hash.
     
     Returns:
-        str: MD5 hash of the file contents.
+        str: BLAKE3 hex digest of the file contents.
     """
+    hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
     with open(filepath, "rb") as f:
-        return hashlib.md5(f.read()).hexdigest()
-
-def load_documents(path: str, selected_files: Optional[List[str]] = None) -> List[Document]:
+        size = os.fstat(f.fileno()).st_size
+        # Empty files can't be mapped
+        if size == 0:
+            return hasher.hexdigest()
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            hasher.update(mm)
+    return hasher.hexdigest()
+
+def _load_file(full_path: str) -> List[Document]:
+    """Load a single document with the loader matching its extension.
+    
+    Args:
+        full_path: Path to a .txt, .pdf or .docx file.
+    
+    Returns:
+        List[Document]: Documents produced by the loader.
+    """
+    if full_path.endswith(".txt"):
+        return TextLoader(full_path).load()
+    elif full_path.endswith(".pdf"):
+        return PyPDFLoader(full_path).load()
+    return Docx2txtLoader(full_path).load()
+
+# Extensions of the files load_documents knows how to load
+DOCUMENT_EXTENSIONS: Final[Tuple[str, ...]] = (".txt", ".pdf", ".docx")
+
+def _iter_files(
+    path: str,
+    prefix: str = ""
+) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """Recursively yield the loadable documents under a directory.
+    
+    Uses ``os.scandir`` so each entry is stat-ed at most once.
+    
+    Args:
+        path: Directory to walk.
+        prefix: Relative path of ``path`` from the root of the walk.
+    
+    Yields:
+        Tuple[str, str, os.stat_result]: Relative path, full path and stat
+            result of each document.
+    """
+    with os.scandir(path) as it:
+        for entry in it:
+            # Like os.walk, don't descend into symlinked directories
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path, prefix + entry.name + os.sep)
+            elif entry.is_file() and entry.name.endswith(DOCUMENT_EXTENSIONS):
+                yield prefix + entry.name, entry.path, entry.stat()
+
+def load_documents(
+    path: str,
+    selected_files: Optional[List[str]] = None
+) -> List[Document]:
     """Load documents from the specified path.
     
+    Hashing and parsing are I/O and C-extension bound, so candidate files are
+    hashed, and changed files loaded, concurrently on a thread pool. Files that
+    are unchanged and already in the vector index are skipped. Each loaded
+    document records its path relative to ``path`` in ``metadata["rel_path"]``.
+    
     Args:
         path: Base path to search for documents.
         selected_files: Optional list of specific files to load.
@@ -103,61 +182,172 @@ def load_documents(path: str, selected_files: Optional[List[str]] = None) -> Lis
         List[Document]: List of loaded documents.
     """
     docs: List[Document] = []
-    hashes: Dict[str, str] = {}
+    hashes: Dict[str, Dict[str, Any]] = {}
     hash_db = load_hash_db()
-    for root, _, files in os.walk(path):
-        for file in files:
-            if not file.endswith((".txt", ".pdf", ".docx")):
-                continue
-            rel_path = os.path.relpath(os.path.join(root, file), path)
-            if selected_files and rel_path not in selected_files:
+    candidates: List[Tuple[str, str, os.stat_result]] = []
+    selected_set = set(selected_files) if selected_files else None
+    for rel_path, full_path, stat in _iter_files(path):
+        if selected_set is not None and rel_path not in selected_set:
+            continue
+
+        # Skip indexed files whose size and mtime match the last time they were hashed
+        entry = hash_db.get(rel_path)
+        if (
+            entry is not None and _is_indexed(entry)
+            and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+        ):
+            continue
+
+        candidates.append((rel_path, full_path, stat))
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        changed: List[Tuple[str, str]] = []
+        file_hashes = executor.map(hash_file, [path for _, path, _ in candidates])
+        for candidate, file_hash in zip(candidates, file_hashes, strict=True):
+            rel_path, full_path, stat = candidate
+            entry = hash_db.get(rel_path, {})
+            indexed = entry.get("h") == file_hash and _is_indexed(entry)
+            # Keep the previous chunk ids so append_to_index can replace them
+            hashes[rel_path] = {
+                **entry,
+                "h": file_hash,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "indexed": indexed
+            }
+            if indexed:
+                # Touched but unchanged; only the stored stat needs refreshing
                 continue
+            changed.append((rel_path, full_path))
 
-            full_path = os.path.join(path, rel_path)
-            if not os.path.isfile(full_path):
-                continue
-
-            file_hash = hash_file(full_path)
-            if rel_path in hash_db and hash_db[rel_path] == file_hash:
-                continue
-
-            if file.endswith(".txt"):
-                docs.extend(TextLoader(full_path).load())
-            elif file.endswith(".pdf"):
-                docs.extend(PyPDFLoader(full_path).load())
-            elif file.endswith(".docx"):
-                docs.extend(Docx2txtLoader(full_path).load())
-
-            hashes[rel_path] = file_hash
+        loaded_docs = executor.map(_load_file, [full_path for _, full_path in changed])
+        for (rel_path, _), loaded in zip(changed, loaded_docs, strict=True):
+            for doc in loaded:
+                doc.metadata["rel_path"] = rel_path
+            docs.extend(loaded)
 
     update_hash_db(hashes)
     return docs
 
-def load_hash_db() -> Dict[str, str]:
+# Serializes read-modify-write updates of the hash database
+_HASH_DB_LOCK: Final[threading.Lock] = threading.Lock()
+
+def load_hash_db() -> Dict[str, Dict[str, Any]]:
     """Load the hash database from disk.
     
+    Entries written by older versions, which stored a bare hash string, are
+    dropped so the corresponding files are hashed again.
+    
     Returns:
-        Dict[str, str]: Dictionary mapping file paths to their hashes.
+        Dict[str, Dict[str, Any]]: Dictionary mapping file paths to entries with
+            the file hash (``h``), modification time (``mtime_ns``) and size
+            (``size``) recorded when it was hashed, whether the file is in the
+            vector index (``indexed``) and the content hashes of its chunks,
+            which are their ids there (``ids``).
     """
     if os.path.exists(HASH_DB_PATH):
         with open(HASH_DB_PATH, "r") as f:
-            return json.load(f)
+            return {
+                rel_path: entry
+                for rel_path, entry in json.load(f).items()
+                if isinstance(entry, dict)
+            }
     return {}
 
-def update_hash_db(new_hashes: Dict[str, str]) -> None:
+def _is_indexed(entry: Optional[Dict[str, Any]]) -> bool:
+    """Check whether a hash database entry's file is in the vector index.
+    
+    Entries without an ``indexed`` flag predate it and count as not indexed, so
+    their files are loaded and indexed again.
+    
+    Args:
+        entry: Hash database entry for a file, or None if it has none.
+    
+    Returns:
+        bool: True if the file's chunks are in the vector index.
+    """
+    return bool(entry and entry.get("indexed", False))
+
+def update_hash_db(new_hashes: Dict[str, Dict[str, Any]]) -> None:
     """Update the hash database with new file hashes.
     
+    The database is written to a uniquely named temporary file that then
+    replaces the old one, so a crash mid-write can't leave it truncated. The
+    read-modify-write runs under ``_HASH_DB_LOCK`` so concurrent updates from
+    other threads (e.g. Streamlit sessions) don't drop each other's entries.
+    
     Args:
-        new_hashes: Dictionary of new file hashes to add/update.
+        new_hashes: Dictionary of new hash entries to add/update.
     """
-    hash_db = load_hash_db()
-    hash_db.update(new_hashes)
-    with open(HASH_DB_PATH, "w") as f:
-        json.dump(hash_db, f)
+    if not new_hashes:
+        return
+    with _HASH_DB_LOCK:
+        hash_db = load_hash_db()
+        hash_db.update(new_hashes)
+        with tempfile.NamedTemporaryFile(
+            "w",
+            dir=os.path.dirname(HASH_DB_PATH) or ".",
+            prefix=os.path.basename(HASH_DB_PATH),
+            suffix=".tmp",
+            delete=False
+        ) as f:
+            tmp_path = f.name
+            try:
+                json.dump(hash_db, f)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                f.close()
+                os.remove(tmp_path)
+                raise
+        os.replace(tmp_path, HASH_DB_PATH)
+
+@functools.lru_cache(maxsize=1)
+def _get_embedder(model_name: str, batch_size: int) -> SentenceTransformerEmbeddings:
+    """Return a shared embedding model instance.
+    
+    Loading the sentence-transformer weights is expensive, so the instance is
+    created once and reused by every caller.
+    
+    Args:
+        model_name: Name of the sentence-transformer model to load.
+        batch_size: Number of texts encoded per forward pass.
+    
+    Returns:
+        SentenceTransformerEmbeddings: The cached embedding model.
+    """
+    return SentenceTransformerEmbeddings(
+        model_name=model_name,
+        encode_kwargs={"batch_size": batch_size}
+    )
+
+@functools.lru_cache(maxsize=1)
+def _get_splitter(
+    chunk_size: int,
+    chunk_overlap: int
+) -> RecursiveCharacterTextSplitter:
+    """Return a shared text splitter for chunking documents before embedding.
+    
+    Args:
+        chunk_size: Maximum number of characters per chunk.
+        chunk_overlap: Number of characters shared by consecutive chunks.
+    
+    Returns:
+        RecursiveCharacterTextSplitter: The cached splitter.
+    """
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
 
 def append_to_index(new_docs: List[Document]) -> FAISS:
     """Append new documents to the vector store index.
     
+    Documents loaded by ``load_documents`` are embedded only if their file is
+    not already indexed, and only chunks whose text isn't in the index yet are
+    embedded. Chunks from an earlier version of a file are removed from the
+    index unless another file still uses them.
+    
     Args:
         new_docs: List of documents to append.
     
@@ -165,30 +355,141 @@ def append_to_index(new_docs: List[Document]) -> FAISS:
         FAISS: Updated vector store instance.
     
     Raises:
+        ValueError: If there is no index yet and the documents hold no text.
         Exception: If appending documents fails.
     """
+    hash_db = load_hash_db()
+    # Documents without "rel_path" (e.g. stories added to memory) don't come
+    # from load_documents and aren't tracked in the hash database
+    new_docs = [
+        doc for doc in new_docs
+        if "rel_path" not in doc.metadata
+        or not _is_indexed(hash_db.get(doc.metadata["rel_path"]))
+    ]
     if not new_docs:
         return load_vectordb()
     try:
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=VECTOR_STORE_SETTINGS["chunk_size"],
-            chunk_overlap=VECTOR_STORE_SETTINGS["chunk_overlap"]
+        splitter = _get_splitter(
+            VECTOR_STORE_SETTINGS["chunk_size"],
+            VECTOR_STORE_SETTINGS["chunk_overlap"]
         )
         chunks = splitter.split_documents(new_docs)
-        embedder = SentenceTransformerEmbeddings(
-            model_name=VECTOR_STORE_SETTINGS["embedding_model"]
+
+        # Chunks of tracked files are keyed by the BLAKE3 hash of their text,
+        # so a chunk shared by several files is embedded only once; anything
+        # else (e.g. stories added to memory) gets a random id
+        chunk_ids: Dict[str, List[str]] = {
+            doc.metadata["rel_path"]: [] for doc in new_docs
+            if "rel_path" in doc.metadata and doc.metadata["rel_path"] in hash_db
+        }
+        pending: Dict[str, Document] = {}
+        for chunk in chunks:
+            rel_path = chunk.metadata.get("rel_path")
+            if rel_path in chunk_ids:
+                chunk_id = blake3.blake3(chunk.page_content.encode("utf-8")).hexdigest()
+                chunk_ids[rel_path].append(chunk_id)
+            else:
+                chunk_id = str(uuid.uuid4())
+            pending.setdefault(chunk_id, chunk)
+
+        embedder = _get_embedder(
+            VECTOR_STORE_SETTINGS["embedding_model"],
+            VECTOR_STORE_SETTINGS["embedding_batch_size"]
         )
         if os.path.exists(INDEX_PATH):
-            vectordb = FAISS.load_local(INDEX_PATH, embedder, allow_dangerous_deserialization=True)
-            vectordb.add_documents(chunks)
+            vectordb = FAISS.load_local(
+                INDEX_PATH, embedder, allow_dangerous_deserialization=True
+            )
+            indexed_ids = set(vectordb.index_to_docstore_id.values())
+            # Drop chunks from earlier versions of these files unless another
+            # file, or the new version, still uses them
+            in_use = set(pending)
+            for rel_path, entry in hash_db.items():
+                if rel_path not in chunk_ids:
+                    in_use.update(entry.get("ids", []))
+            stale = {
+                chunk_id
+                for rel_path in chunk_ids
+                for chunk_id in hash_db[rel_path].get("ids", [])
+                if chunk_id not in in_use and chunk_id in indexed_ids
+            }
+            if stale:
+                vectordb.delete(ids=list(stale))
+            new_ids = [chunk_id for chunk_id in pending if chunk_id not in indexed_ids]
+            if new_ids:
+                vectordb.add_documents(
+                    [pending[chunk_id] for chunk_id in new_ids], ids=new_ids
+                )
+        elif not pending:
+            # Nothing to build the first index from, e.g. only empty files
+            raise ValueError("No document text to index")
         else:
-            vectordb = FAISS.from_documents(chunks, embedder)
+            vectordb = FAISS.from_documents(
+                list(pending.values()), embedder, ids=list(pending)
+            )
         vectordb.save_local(INDEX_PATH)
-        return vectordb
+        update_hash_db({
+            rel_path: {**hash_db[rel_path], "indexed": True, "ids": file_ids}
+            for rel_path, file_ids in chunk_ids.items()
+        })
+        # The index on disk changed, so reload the cached copy; returning it
+        # means the IVF copy is built once per update rather than again on
+        # the next load_vectordb
+        _load_vectordb_cached.clear()
+        return load_vectordb()
     except Exception as e:
         logger.error(f"Failed to append documents to index: {str(e)}")
         raise
 
+def _with_ivf_index(vectordb: FAISS) -> FAISS:
+    """Return a copy of a vector store that searches an IVF index.
+    
+    Flat indexes are scanned in full on every query. Once the store holds
+    ``ivf_min_chunks`` chunks, its vectors are clustered into an
+    ``IndexIVFFlat`` and only ``ivf_nprobe`` clusters are scanned per query.
+    The flat index stays the one saved to disk, since LangChain's deletes
+    assume positional ids that IVF removal doesn't keep.
+    
+    Args:
+        vectordb: Vector store backed by a flat index.
+    
+    Returns:
+        FAISS: ``vectordb`` itself if it is small, otherwise a copy sharing its
+            docstore and backed by an IVF index.
+    """
+    flat = vectordb.index
+    if flat.ntotal < VECTOR_STORE_SETTINGS["ivf_min_chunks"]:
+        return vectordb
+    vectors = flat.reconstruct_n(0, flat.ntotal)
+    nlist = min(64, max(4, int(math.sqrt(flat.ntotal))))
+    quantizer = faiss.IndexFlat(flat.d, flat.metric_type)
+    index = faiss.IndexIVFFlat(quantizer, flat.d, nlist, flat.metric_type)
+    index.train(vectors)
+    index.add(vectors)
+    index.nprobe = VECTOR_STORE_SETTINGS["ivf_nprobe"]
+    ivf_db = copy.copy(vectordb)
+    ivf_db.index = index
+    return ivf_db
+
+@st.cache_resource(show_spinner=False)
+def _load_vectordb_cached() -> FAISS:
+    """Load the vector store from disk, caching it across Streamlit reruns.
+    
+    ``append_to_index`` clears the cache whenever it rewrites the index on disk
+    and reloads it straight away.
+    
+    Returns:
+        FAISS: Vector store instance.
+    """
+    embedder = _get_embedder(
+        VECTOR_STORE_SETTINGS["embedding_model"],
+        VECTOR_STORE_SETTINGS["embedding_batch_size"]
+    )
+    vectordb = FAISS.load_local(
+        INDEX_PATH, embedder, allow_dangerous_deserialization=True
+    )
+    return _with_ivf_index(vectordb)
+
 def load_vectordb() -> FAISS:
     """Load the vector store from disk.
     
@@ -199,19 +500,110 @@ def load_vectordb() -> FAISS:
         Exception: If loading the vector store fails.
     """
     try:
-        embedder = SentenceTransformerEmbeddings(
-            model_name=VECTOR_STORE_SETTINGS["embedding_model"]
-        )
-        return FAISS.load_local(INDEX_PATH, embedder, allow_dangerous_deserialization=True)
+        return _load_vectordb_cached()
     except Exception as e:
         logger.error(f"Failed to load vector database: {str(e)}")
         raise
 
+# Shared HTTP session so requests to the llama.cpp server reuse connections
+_SESSION: Final[requests.Session] = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Errors meaning the llama.cpp server couldn't be reached; only these warrant
+# checking the server again
+_CONNECTION_ERRORS: Final[Tuple[type, ...]] = (
+    requests.ConnectionError,
+    requests.Timeout,
+    openai.APIConnectionError
+)
+
+def _is_connection_error(error: BaseException) -> bool:
+    """Check whether an error, or one it was raised from, is a connection failure.
+    
+    Args:
+        error: The exception to inspect.
+    
+    Returns:
+        bool: True if ``error`` or its cause/context chain holds one of
+            ``_CONNECTION_ERRORS``.
+    """
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        if isinstance(current, _CONNECTION_ERRORS):
+            return True
+        seen.add(id(current))
+        current = current.__cause__ or current.__context__
+    return False
+
+@functools.lru_cache(maxsize=1)
+def _verify_server(base_url: str, model: str) -> None:
+    """Check that the llama.cpp server is reachable and serves the model.
+    
+    Only successful checks are cached, so once the server is up the request
+    is made once per process; ``generate_story`` clears the cache when a
+    generation fails to reach the server so the next attempt checks again.
+    
+    Args:
+        base_url: Base URL of the OpenAI-compatible server.
+        model: Name of the model that must be available.
+    
+    Raises:
+        ConnectionError: If the server can't be reached or lacks the model.
+    """
+    logger.info(f"Attempting to connect to local LLM server at {base_url}")
+    try:
+        # Use the models endpoint to check server availability
+        response = _SESSION.get(f"{base_url}/models", timeout=5)
+        if response.status_code != 200:
+            raise ConnectionError(f"Server returned status code {response.status_code}")
+        
+        # Check if our model is available
+        models_data = response.json()
+        available_models = [entry.get("id") for entry in models_data.get("data", [])]
+        if model not in available_models:
+            raise ConnectionError(
+                f"Model {model} not found in available models: {available_models}"
+            )
+            
+        logger.info(
+            f"Server connection successful. Available models: {available_models}"
+        )
+    except requests.exceptions.RequestException as e:
+        raise ConnectionError(f"Failed to connect to local LLM server: {str(e)}") from e
+    except json.JSONDecodeError as e:
+        raise ConnectionError(f"Invalid server response format: {str(e)}") from e
+
+@functools.lru_cache(maxsize=1)
+def _get_llm(base_url: str, model: str) -> ChatOpenAI:
+    """Return a shared LangChain client for the llama.cpp server.
+    
+    Args:
+        base_url: Base URL of the OpenAI-compatible server.
+        model: Name of the model to generate with.
+    
+    Returns:
+        ChatOpenAI: The cached LLM instance.
+    """
+    return ChatOpenAI(
+        model_name=MODEL_SETTINGS["model_name"],
+        temperature=MODEL_SETTINGS["temperature"],
+        max_tokens=MODEL_SETTINGS["max_tokens"],
+        openai_api_key=LOCAL_LLM_SETTINGS["api_key"],
+        openai_api_base=base_url,
+        model=model,
+        streaming=False,  # Disable streaming for better compatibility
+        request_timeout=300,  # Increase timeout for larger responses
+        max_retries=5  # Add retries for better reliability
+    )
+
 def load_llm(system_prompt: Optional[str] = None) -> ChatOpenAI:
     """Load the local LLM model through llama.cpp server.
     
     This function initializes a connection to the local llama.cpp server using
-    LangChain's OpenAI-compatible interface.
+    LangChain's OpenAI-compatible interface. The server check and the client
+    are cached, so repeat calls don't hit the network.
     
     Args:
         system_prompt: Optional custom system prompt to use.
@@ -223,40 +615,13 @@ def load_llm(system_prompt: Optional[str] = None) -> ChatOpenAI:
         Exception: If loading the LLM fails.
     """
     try:
-        # Validate server connection first
         base_url = LOCAL_LLM_SETTINGS["base_url"]
-        logger.info(f"Attempting to connect to local LLM server at {base_url}")
-        
-        try:
-            # Use the models endpoint to check server availability
-            response = requests.get(f"{base_url}/models", timeout=5)
-            if response.status_code != 200:
-                raise ConnectionError(f"Server returned status code {response.status_code}")
-            
-            # Check if our model is available
-            models_data = response.json()
-            available_models = [model.get("id") for model in models_data.get("data", [])]
-            if LOCAL_LLM_SETTINGS["model"] not in available_models:
-                raise ConnectionError(f"Model {LOCAL_LLM_SETTINGS['model']} not found in available models: {available_models}")
-                
-            logger.info(f"Server connection successful. Available models: {available_models}")
-        except requests.exceptions.RequestException as e:
-            raise ConnectionError(f"Failed to connect to local LLM server: {str(e)}")
-        except json.JSONDecodeError as e:
-            raise ConnectionError(f"Invalid server response format: {str(e)}")
+        model = LOCAL_LLM_SETTINGS["model"]
+        # Validate server connection first
+        _verify_server(base_url, model)
         
         # Create LangChain OpenAI wrapper for local llama.cpp server
-        llm = ChatOpenAI(
-            model_name=MODEL_SETTINGS["model_name"],
-            temperature=MODEL_SETTINGS["temperature"],
-            max_tokens=MODEL_SETTINGS["max_tokens"],
-            openai_api_key=LOCAL_LLM_SETTINGS["api_key"],
-            openai_api_base=LOCAL_LLM_SETTINGS["base_url"],
-            model=LOCAL_LLM_SETTINGS["model"],
-            streaming=False,  # Disable streaming for better compatibility
-            request_timeout=300,  # Increase timeout for larger responses
-            max_retries=5  # Add retries for better reliability
-        )
+        llm = _get_llm(base_url, model)
         
         logger.info("Successfully initialized connection to local LLM server")
         return llm
@@ -264,6 +629,47 @@ def load_llm(system_prompt: Optional[str] = None) -> ChatOpenAI:
         logger.error(f"Failed to load local LLM: {str(e)}")
         raise
 
+# Background writer for memory stories
+_IO_POOL: Final[ThreadPoolExecutor] = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="story-io"
+)
+
+def memory_story_path(timestamp: str) -> str:
+    """Return the path a story generated at ``timestamp`` is stored under.
+    
+    Args:
+        timestamp: Timestamp for the story.
+    
+    Returns:
+        str: Path of the story's file in MEMORY_STORIES_PATH.
+    """
+    filename = f"story_{timestamp.replace(':', '-').replace('T','_')}.txt"
+    return os.path.join(MEMORY_STORIES_PATH, filename)
+
+def _log_failed_write(future: "Future[str]") -> None:
+    """Log the traceback of a background memory story write that failed.
+    
+    Args:
+        future: The completed write submitted to ``_IO_POOL``.
+    """
+    error = future.exception()
+    if error is not None:
+        logger.error("Background memory story write failed", exc_info=error)
+
+def _store_story_in_background(story_text: str, timestamp: str) -> "Future[str]":
+    """Write a story to memory on ``_IO_POOL`` without waiting for it.
+    
+    Args:
+        story_text: The story text to store.
+        timestamp: Timestamp for the story.
+    
+    Returns:
+        Future[str]: The pending write, resolving to the stored file's path.
+    """
+    future = _IO_POOL.submit(store_story_to_memory, story_text, timestamp)
+    future.add_done_callback(_log_failed_write)
+    return future
+
 def store_story_to_memory(story_text: str, timestamp: str) -> str:
     """Store a generated story to memory.
     
@@ -278,8 +684,7 @@ def store_story_to_memory(story_text: str, timestamp: str) -> str:
         Exception: If storing the story fails.
     """
     try:
-        filename = f"story_{timestamp.replace(':', '-').replace('T','_')}.txt"
-        path = os.path.join(MEMORY_STORIES_PATH, filename)
+        path = memory_story_path(timestamp)
         with open(path, "w", encoding="utf-8") as f:
             f.write(f"[Time: {timestamp}]\n\n{story_text}\n")
         logger.info(f"Story stored to memory: {path}")
@@ -321,7 +726,9 @@ def generate_story(
     try:
         logger.info(f"Starting story generation with mode: '{mode}'")
         timestamp = datetime.now().isoformat()
-        system_prompt = custom_prompt or STORY_STYLES.get(selected_style, STORY_STYLES["Creative Storyteller"])
+        system_prompt = custom_prompt or STORY_STYLES.get(
+            selected_style, _DEFAULT_STYLE
+        )
         
         # Initialize LLM with system prompt
         llm = load_llm(system_prompt)
@@ -330,7 +737,7 @@ def generate_story(
         mode = mode.strip().lower()  # Normalize the mode string
         logger.info(f"Normalized mode: '{mode}'")
         
-        if mode == "direct generation":
+        if mode == _MODE_DIRECT:
             logger.info("Entering direct generation mode")
             try:
                 # Direct generation without RAG
@@ -360,8 +767,8 @@ def generate_story(
                     mode=mode
                 )
                 
-                # Store story to memory
-                store_story_to_memory(story, timestamp)
+                # Store story to memory in the background
+                _store_story_in_background(story, timestamp)
                 
                 return story, [], timestamp
             except Exception as e:
@@ -375,7 +782,11 @@ def generate_story(
             raise ValueError("No documents selected for RAG mode")
             
         docs = load_documents(DOCS_PATH, selected)
-        if not docs:
+        hash_db = load_hash_db()
+        # Unchanged documents aren't reloaded, but are still usable if indexed
+        if not docs and not any(
+            _is_indexed(hash_db.get(rel_path)) for rel_path in selected
+        ):
             logger.error("No documents available for RAG mode")
             raise ValueError("No documents available for RAG mode")
         
@@ -393,19 +804,30 @@ def generate_story(
         story = result["answer"]
         sources = result["sources"]
         
-        # Store story in database
-        db_manager.add_story(
-            prompt=user_input,
-            response=story,
-            system_prompt=system_prompt,
-            style=selected_style,
-            mode=mode
-        )
+        # Store the story and the documents it was generated from in one commit
+        with db_manager.transaction():
+            story_id = db_manager.add_story(
+                prompt=user_input,
+                response=story,
+                system_prompt=system_prompt,
+                style=selected_style,
+                mode=mode
+            )
+            document_ids = db_manager.add_documents_bulk(
+                [
+                    (rel_path, hash_db[rel_path]["h"])
+                    for rel_path in selected if rel_path in hash_db
+                ]
+            )
+            db_manager.link_story_to_documents(story_id, document_ids)
         
-        # Store story to memory
-        store_story_to_memory(story, timestamp)
+        # Store story to memory in the background
+        _store_story_in_background(story, timestamp)
         
         return story, sources, timestamp
     except Exception as e:
+        if _is_connection_error(e):
+            # The server went away; check it again on the next attempt
+            _verify_server.cache_clear()
         logger.error(f"Failed to generate story: {str(e)}")
         raise 
\ No newline at end of file
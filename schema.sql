@@ -7,7 +7,10 @@ CREATE TABLE IF NOT EXISTS stories (
     style TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     mode TEXT,
-    memory_added BOOLEAN DEFAULT FALSE
+    memory_added BOOLEAN DEFAULT FALSE,
+    response_length INTEGER,
+    word_count INTEGER,
+    paragraph_count INTEGER
 );
 
 CREATE TABLE IF NOT EXISTS documents (
@@ -24,4 +27,38 @@ CREATE TABLE IF NOT EXISTS story_documents (
     FOREIGN KEY (story_id) REFERENCES stories(id),
     FOREIGN KEY (document_id) REFERENCES documents(id),
     PRIMARY KEY (story_id, document_id)
-); 
\ No newline at end of file
+);
+
+-- Indexes for the filter/sort columns used by DatabaseManager. Listings are
+-- newest first by id, which each index already carries as its rowid.
+CREATE INDEX IF NOT EXISTS idx_stories_created ON stories(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_stories_style ON stories(style);
+CREATE INDEX IF NOT EXISTS idx_stories_mode ON stories(mode);
+CREATE INDEX IF NOT EXISTS idx_stories_memory ON stories(memory_added) WHERE memory_added = 1;
+CREATE INDEX IF NOT EXISTS idx_story_documents_doc ON story_documents(document_id);
+CREATE INDEX IF NOT EXISTS idx_story_documents_story ON story_documents(story_id);
+
+-- Full-text index over story prompts and responses, kept in sync by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS stories_fts USING fts5(
+    prompt,
+    response,
+    content='stories',
+    content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS stories_ai AFTER INSERT ON stories BEGIN
+    INSERT INTO stories_fts (rowid, prompt, response)
+    VALUES (new.id, new.prompt, new.response);
+END;
+
+CREATE TRIGGER IF NOT EXISTS stories_ad AFTER DELETE ON stories BEGIN
+    INSERT INTO stories_fts (stories_fts, rowid, prompt, response)
+    VALUES ('delete', old.id, old.prompt, old.response);
+END;
+
+CREATE TRIGGER IF NOT EXISTS stories_au AFTER UPDATE OF prompt, response ON stories BEGIN
+    INSERT INTO stories_fts (stories_fts, rowid, prompt, response)
+    VALUES ('delete', old.id, old.prompt, old.response);
+    INSERT INTO stories_fts (rowid, prompt, response)
+    VALUES (new.id, new.prompt, new.response);
+END;
@@ -17,7 +17,8 @@ setup(
         "sentence-transformers",
         "pandas",
         "plotly",
-        "requests"
+        "requests",
+        "blake3"
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.10",
 ) 
\ No newline at end of file
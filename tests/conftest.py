@@ -4,56 +4,66 @@ This module provides pytest fixtures for setting up test environments, including
 test directories, database instances, and sample data.
 """
 import pytest
-import os
-import shutil
-from typing import Dict, Any, Generator
-from llm_story_generator.db_manager import DatabaseManager
-from llm_story_generator.config import DOCS_PATH, MEMORY_STORIES_PATH, INDEX_PATH, HASH_DB_PATH
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Generator, List
 
-@pytest.fixture(scope="session")
-def test_dirs() -> Generator[Dict[str, str], None, None]:
-    """Create and clean up test directories.
-    
-    This fixture creates the necessary test directories and cleans them up after
-    all tests are complete.
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models import FakeListChatModel
+from langchain_community.vectorstores import FAISS
+from langchain.schema import Document
+
+from llm_story_generator import config, story_generator
+from llm_story_generator.story_generator import append_to_index, load_documents
+
+@dataclass(frozen=True)
+class SampleDoc:
+    """A sample document written to the test DOCS_PATH for the session.
     
-    Yields:
-        Dict[str, str]: Dictionary containing paths to test directories.
+    Attributes:
+        path: Path to the document file.
+        parent: Directory containing the document.
+        content: Text written to the document.
     """
-    # Create test directories
-    os.makedirs(DOCS_PATH, exist_ok=True)
-    os.makedirs(MEMORY_STORIES_PATH, exist_ok=True)
-    os.makedirs(os.path.dirname(INDEX_PATH), exist_ok=True)
-    
-    yield {
-        "docs": DOCS_PATH,
-        "memory": MEMORY_STORIES_PATH,
-        "index": INDEX_PATH
-    }
-    
-    # Cleanup after tests
-    if os.path.exists(DOCS_PATH):
-        shutil.rmtree(DOCS_PATH)
-    if os.path.exists(INDEX_PATH):
-        shutil.rmtree(INDEX_PATH)
-    if os.path.exists(HASH_DB_PATH):
-        os.remove(HASH_DB_PATH)
+    path: Path
+    parent: Path
+    content: str
 
-@pytest.fixture
-def db_manager() -> Generator[DatabaseManager, None, None]:
-    """Create a test database manager.
+@pytest.fixture(scope="session", autouse=True)
+def test_dirs(
+    tmp_path_factory: pytest.TempPathFactory
+) -> Generator[Dict[str, str], None, None]:
+    """Point the document, memory and index paths at a private temp directory.
     
-    This fixture creates a fresh database instance for each test and cleans it up
-    afterward.
+    ``tmp_path_factory`` gives every pytest-xdist worker its own base
+    directory, so workers never share the docs folder, FAISS index or hash
+    database. The fixture is autouse because story generation writes memory
+    stories even in tests that never ask for these paths.
+    
+    Args:
+        tmp_path_factory: Session-scoped temporary directory factory.
     
     Yields:
-        DatabaseManager: Database manager instance for testing.
+        Dict[str, str]: Dictionary containing paths to test directories.
     """
-    db = DatabaseManager()
-    db.create_tables()
-    yield db
-    # Cleanup after each test
-    db.drop_tables()
+    root = tmp_path_factory.mktemp("storygen")
+    paths = {
+        "DOCS_PATH": str(root / "docs"),
+        "MEMORY_STORIES_PATH": str(root / "docs" / "memory_stories"),
+        "INDEX_PATH": str(root / "faiss_index"),
+        "HASH_DB_PATH": str(root / "hash_index.json")
+    }
+    with pytest.MonkeyPatch.context() as mp:
+        # story_generator imported the names from config, so patch both
+        for name, value in paths.items():
+            mp.setattr(config, name, value)
+            mp.setattr(story_generator, name, value)
+        config.ensure_directories()
+        yield {
+            "docs": paths["DOCS_PATH"],
+            "memory": paths["MEMORY_STORIES_PATH"],
+            "index": paths["INDEX_PATH"]
+        }
 
 @pytest.fixture
 def sample_story() -> Dict[str, Any]:
@@ -71,15 +81,106 @@ def sample_story() -> Dict[str, Any]:
         "memory_added": False
     }
 
-@pytest.fixture
-def sample_document() -> str:
+@pytest.fixture(scope="session")
+def sample_document(test_dirs: Dict[str, str]) -> SampleDoc:
     """Create a sample document for testing.
     
+    Args:
+        test_dirs: Dictionary of test directory paths.
+    
     Returns:
-        str: Path to the created sample document.
+        SampleDoc: The created document's path, parent directory and content.
     """
-    doc_path = os.path.join(DOCS_PATH, "test_story.txt")
+    doc_path = Path(test_dirs["docs"]) / "test_story.txt"
     content = "This is a test story document."
-    with open(doc_path, "w", encoding="utf-8") as f:
-        f.write(content)
-    return doc_path 
\ No newline at end of file
+    doc_path.write_text(content, encoding="utf-8")
+    return SampleDoc(path=doc_path, parent=doc_path.parent, content=content)
+
+@pytest.fixture(scope="session")
+def loaded_docs(sample_document: SampleDoc) -> List[Document]:
+    """Load the sample document's directory once for the whole session.
+    
+    Args:
+        sample_document: The sample document on disk.
+    
+    Returns:
+        List[Document]: LangChain documents loaded from the sample directory.
+    """
+    return load_documents(str(sample_document.parent))
+
+@pytest.fixture(scope="session")
+def fake_embeddings() -> Generator[DeterministicFakeEmbedding, None, None]:
+    """Replace the sentence-transformer embedder with a deterministic fake.
+    
+    The vector index tests only check that an index is built and loaded, so
+    running the real model on every chunk is wasted time.
+    
+    Yields:
+        DeterministicFakeEmbedding: The fake embeddings returned in place of
+            the real model.
+    """
+    embeddings = DeterministicFakeEmbedding(size=384)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            story_generator, "_get_embedder", lambda model_name, batch_size: embeddings
+        )
+        yield embeddings
+
+@pytest.fixture(scope="session")
+def built_vectordb(
+    loaded_docs: List[Document],
+    fake_embeddings: DeterministicFakeEmbedding
+) -> FAISS:
+    """Build the vector index from the sample documents once per session.
+    
+    Args:
+        loaded_docs: Documents loaded from the sample directory.
+        fake_embeddings: Fake embedder used instead of the real model.
+    
+    Returns:
+        FAISS: The vector store returned by ``append_to_index``.
+    """
+    return append_to_index(loaded_docs)
+
+@pytest.fixture
+def isolated_index(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    fake_embeddings: DeterministicFakeEmbedding
+) -> Generator[Path, None, None]:
+    """Give a test its own FAISS index and hash database.
+    
+    For tests that inspect exactly what ``append_to_index`` stores, without
+    the session's sample document in the way.
+    
+    Args:
+        tmp_path: Per-test temporary directory provided by pytest.
+        monkeypatch: Pytest fixture used to redirect the index paths.
+        fake_embeddings: Fake embedder used instead of the real model.
+    
+    Yields:
+        Path: Empty directory for the test's documents.
+    """
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    monkeypatch.setattr(story_generator, "INDEX_PATH", str(tmp_path / "faiss_index"))
+    monkeypatch.setattr(
+        story_generator, "HASH_DB_PATH", str(tmp_path / "hash_index.json")
+    )
+    # Don't hand out, or leave behind, a store cached from another index
+    story_generator._load_vectordb_cached.clear()
+    yield docs_dir
+    story_generator._load_vectordb_cached.clear()
+
+@pytest.fixture(scope="session")
+def fake_llm() -> FakeListChatModel:
+    """Return a chat model stand-in shared by the story generation tests.
+    
+    A real LangChain chat model, so ``invoke`` returns an ``AIMessage`` and the
+    RAG chain accepts it. With a single response it gives the same answer on
+    every call, so one instance serves the whole session.
+    
+    Returns:
+        FakeListChatModel: Chat model that answers every call with a fixed story.
+    """
+    return FakeListChatModel(responses=["Generated story content"])
@@ -4,9 +4,13 @@ This module contains tests for the DatabaseManager class, covering story and doc
 management, linking, and statistics retrieval.
 """
 import pytest
+import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, Any
 
+from llm_story_generator import db_manager as db_manager_module
+from llm_story_generator.db_manager import ConnectionPool, DatabaseManager
+
 def test_add_story(db_manager: Any, sample_story: Dict[str, Any]) -> None:
     """Test adding a story to the database.
     
@@ -25,36 +29,36 @@ def test_add_story(db_manager: Any, sample_story: Dict[str, Any]) -> None:
     assert story["style"] == sample_story["style"]
     assert story["mode"] == sample_story["mode"]
 
-def test_add_document(db_manager: Any, sample_document: str) -> None:
+def test_add_document(db_manager: Any, sample_document: Any) -> None:
     """Test adding a document to the database.
     
     Args:
         db_manager: Database manager instance.
-        sample_document: Sample document path for testing.
+        sample_document: Sample document on disk.
     """
-    doc_id = db_manager.add_document(sample_document, "test_hash")
+    doc_id = db_manager.add_document(str(sample_document.path), "test_hash")
     assert doc_id is not None
     
     # Verify document was added
     doc = db_manager.get_document(doc_id)
     assert doc is not None
-    assert doc["path"] == sample_document
+    assert doc["path"] == str(sample_document.path)
     assert doc["hash"] == "test_hash"
 
 def test_link_story_to_document(
     db_manager: Any,
     sample_story: Dict[str, Any],
-    sample_document: str
+    sample_document: Any
 ) -> None:
     """Test linking a story to a document.
     
     Args:
         db_manager: Database manager instance.
         sample_story: Sample story data for testing.
-        sample_document: Sample document path for testing.
+        sample_document: Sample document on disk.
     """
     story_id = db_manager.add_story(**sample_story)
-    doc_id = db_manager.add_document(sample_document, "test_hash")
+    doc_id = db_manager.add_document(str(sample_document.path), "test_hash")
     
     db_manager.link_story_to_document(story_id, doc_id)
     
@@ -71,9 +75,11 @@ def test_get_enhanced_statistics(db_manager: Any, sample_story: Dict[str, Any])
         sample_story: Sample story data for testing.
     """
     # Add multiple stories with different styles and modes
-    db_manager.add_story(**sample_story)
-    db_manager.add_story(**{**sample_story, "style": "One Piece Writer"})
-    db_manager.add_story(**{**sample_story, "mode": "RAG with Documents"})
+    db_manager.add_stories_bulk([
+        sample_story,
+        {**sample_story, "style": "One Piece Writer"},
+        {**sample_story, "mode": "RAG with Documents"}
+    ])
     
     stats = db_manager.get_enhanced_statistics()
     
@@ -82,6 +88,7 @@ def test_get_enhanced_statistics(db_manager: Any, sample_story: Dict[str, Any])
     assert "One Piece Writer" in stats["stories_by_style"]
     assert "Direct Generation" in stats["stories_by_mode"]
     assert "RAG with Documents" in stats["stories_by_mode"]
+    assert stats["avg_response_length"] == len(sample_story["response"])
 
 def test_get_stories_last_7_days(db_manager: Any, sample_story: Dict[str, Any]) -> None:
     """Test getting stories from the last 7 days.
@@ -112,37 +119,358 @@ def test_get_story_by_id(db_manager: Any, sample_story: Dict[str, Any]) -> None:
     assert story["prompt"] == sample_story["prompt"]
     assert story["response"] == sample_story["response"]
 
-def test_get_document_by_id(db_manager: Any, sample_document: str) -> None:
+def test_get_document_by_id(db_manager: Any, sample_document: Any) -> None:
     """Test retrieving a document by ID.
     
     Args:
         db_manager: Database manager instance.
-        sample_document: Sample document path for testing.
+        sample_document: Sample document on disk.
     """
-    doc_id = db_manager.add_document(sample_document, "test_hash")
+    doc_id = db_manager.add_document(str(sample_document.path), "test_hash")
     doc = db_manager.get_document(doc_id)
     
     assert doc is not None
     assert doc["id"] == doc_id
-    assert doc["path"] == sample_document
+    assert doc["path"] == str(sample_document.path)
     assert doc["hash"] == "test_hash"
 
 def test_get_story_documents(
     db_manager: Any,
     sample_story: Dict[str, Any],
-    sample_document: str
+    sample_document: Any
 ) -> None:
     """Test retrieving documents linked to a story.
     
     Args:
         db_manager: Database manager instance.
         sample_story: Sample story data for testing.
-        sample_document: Sample document path for testing.
+        sample_document: Sample document on disk.
     """
     story_id = db_manager.add_story(**sample_story)
-    doc_id = db_manager.add_document(sample_document, "test_hash")
+    doc_id = db_manager.add_document(str(sample_document.path), "test_hash")
     db_manager.link_story_to_document(story_id, doc_id)
     
     docs = db_manager.get_story_documents(story_id)
     assert len(docs) == 1
-    assert docs[0]["document_id"] == doc_id 
\ No newline at end of file
+    assert docs[0]["document_id"] == doc_id 
+
+def test_stories_listed_newest_first(
+    db_manager: Any,
+    sample_story: Dict[str, Any]
+) -> None:
+    """Test that story listings are newest first even within the same second.
+    
+    Args:
+        db_manager: Database manager instance.
+        sample_story: Sample story data for testing.
+    """
+    db_manager.add_stories_bulk(
+        [{**sample_story, "prompt": f"Prompt {i}"} for i in range(5)]
+    )
+    
+    stories = db_manager.get_all_stories(limit=3)
+    assert [story["prompt"] for story in stories] == [
+        "Prompt 4", "Prompt 3", "Prompt 2"
+    ]
+    
+    stories = db_manager.get_stories_by_style(sample_story["style"], limit=3)
+    assert [story["prompt"] for story in stories] == [
+        "Prompt 4", "Prompt 3", "Prompt 2"
+    ]
+
+def test_transaction_commits_writes_together(
+    db_manager: Any,
+    ro_conn: sqlite3.Connection,
+    sample_story: Dict[str, Any],
+    sample_document: Any
+) -> None:
+    """Test that writes inside a transaction are committed as one.
+    
+    Args:
+        db_manager: Database manager instance.
+        ro_conn: Read-only connection for verifying the database contents.
+        sample_story: Sample story data for testing.
+        sample_document: Sample document on disk.
+    """
+    with db_manager.transaction():
+        story_id = db_manager.add_story(**sample_story)
+        doc_ids = db_manager.add_documents_bulk(
+            [(str(sample_document.path), "test_hash")]
+        )
+        db_manager.link_story_to_documents(story_id, doc_ids)
+    
+    docs = db_manager.get_story_documents(story_id)
+    assert len(docs) == 1
+    assert docs[0]["id"] == doc_ids[0]
+    
+    # Committed, so visible to a separate connection
+    linked = ro_conn.execute(
+        "SELECT COUNT(*) FROM story_documents WHERE story_id = ?", (story_id,)
+    ).fetchone()[0]
+    assert linked == 1
+
+def test_transaction_rolls_back_on_error(
+    db_manager: Any,
+    sample_story: Dict[str, Any]
+) -> None:
+    """Test that a failing transaction leaves no writes behind.
+    
+    Args:
+        db_manager: Database manager instance.
+        sample_story: Sample story data for testing.
+    """
+    with pytest.raises(RuntimeError):
+        with db_manager.transaction():
+            story_id = db_manager.add_story(**sample_story)
+            raise RuntimeError("abort")
+    
+    assert db_manager.get_story(story_id) is None
+
+def test_connection_pragmas(file_db_path: str) -> None:
+    """Test that file databases run in WAL mode with relaxed syncing.
+    
+    Args:
+        file_db_path: Path for a file-backed test database.
+    """
+    db = DatabaseManager(db_path=file_db_path)
+    try:
+        with db._writer.acquire() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        with db._readers.acquire() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+    finally:
+        db.close()
+
+def test_response_stats_stored_on_insert(
+    db_manager: Any,
+    sample_story: Dict[str, Any]
+) -> None:
+    """Test that response statistics are computed when a story is added.
+    
+    Args:
+        db_manager: Database manager instance.
+        sample_story: Sample story data for testing.
+    """
+    story = {**sample_story, "response": "One two three.\n\nFour five."}
+    story_id = db_manager.add_story(**story)
+    
+    analytics = db_manager.get_story_analytics(story_id)
+    assert analytics["response_stats"] == {
+        "length": len(story["response"]),
+        "word_count": 5,
+        "paragraph_count": 2
+    }
+
+def test_response_stats_backfilled_once(file_db_path: str) -> None:
+    """Test that stories from before the statistic columns are backfilled once.
+    
+    Args:
+        file_db_path: Path for a file-backed test database.
+    """
+    conn = sqlite3.connect(file_db_path)
+    conn.execute("""
+        CREATE TABLE stories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            prompt TEXT NOT NULL,
+            response TEXT NOT NULL,
+            system_prompt TEXT,
+            style TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            mode TEXT,
+            memory_added BOOLEAN DEFAULT FALSE
+        )
+    """)
+    conn.execute(
+        "INSERT INTO stories (prompt, response) VALUES ('Prompt', 'Old story')"
+    )
+    conn.commit()
+    conn.close()
+    
+    db = DatabaseManager(db_path=file_db_path)
+    try:
+        assert db.get_story_analytics(1)["response_stats"]["word_count"] == 2
+        with db._writer.acquire() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+            # Clear a value so that a second backfill would be visible
+            conn.execute("UPDATE stories SET word_count = NULL")
+    finally:
+        db.close()
+    
+    # A second start doesn't scan for rows to backfill again
+    db = DatabaseManager(db_path=file_db_path)
+    try:
+        assert db.get_story_analytics(1)["response_stats"]["word_count"] is None
+    finally:
+        db.close()
+
+def test_analyze_runs_on_first_start_only(
+    file_db_path: str,
+    sample_story: Dict[str, Any]
+) -> None:
+    """Test that planner statistics are gathered when the schema is created only.
+    
+    Args:
+        file_db_path: Path for a file-backed test database.
+        sample_story: Sample story data for testing.
+    """
+    db = DatabaseManager(db_path=file_db_path)
+    try:
+        db.add_stories_bulk([sample_story] * 10)
+    finally:
+        db.close()
+    
+    db = DatabaseManager(db_path=file_db_path)
+    db.close()
+    
+    # The stories were added after the only ANALYZE, so they have no statistics
+    with sqlite3.connect(file_db_path) as conn:
+        analyzed = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_stat1 WHERE tbl = 'stories'"
+        ).fetchone()[0]
+    assert analyzed == 0
+
+def test_export_keeps_story_columns(
+    db_manager: Any,
+    sample_story: Dict[str, Any]
+) -> None:
+    """Test that exports don't include the precomputed statistic columns.
+    
+    Args:
+        db_manager: Database manager instance.
+        sample_story: Sample story data for testing.
+    """
+    db_manager.add_story(**sample_story)
+    
+    story = next(db_manager.export_all_stories("json"))
+    assert set(story) == {
+        "id", "prompt", "response", "system_prompt", "style", "created_at", "mode",
+        "memory_added"
+    }
+
+def test_partial_export_releases_connection(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_story: Dict[str, Any]
+) -> None:
+    """Test that a partly consumed export doesn't hold the only connection.
+    
+    Args:
+        monkeypatch: Pytest fixture used to shrink the export batches.
+        sample_story: Sample story data for testing.
+    """
+    monkeypatch.setattr(db_manager_module, "_EXPORT_BATCH_ROWS", 2)
+    monkeypatch.setattr(ConnectionPool, "acquire_timeout", 1.0)
+    # Reads and writes share one connection for a private in-memory database
+    db = DatabaseManager(db_path=":memory:")
+    try:
+        db.add_stories_bulk(
+            [{**sample_story, "prompt": f"Prompt {i}"} for i in range(5)]
+        )
+        
+        export = db.export_all_stories("csv")
+        assert next(export)["prompt"] == "Prompt 4"
+        db.add_story(**sample_story)
+        assert [row["prompt"] for row in export] == [
+            "Prompt 3", "Prompt 2", "Prompt 1", "Prompt 0"
+        ]
+    finally:
+        db.close()
+
+def test_acquire_times_out(file_db_path: str) -> None:
+    """Test that waiting for a busy pool raises instead of blocking forever.
+    
+    Args:
+        file_db_path: Path for a file-backed test database.
+    """
+    pool = ConnectionPool(file_db_path, min_connections=1)
+    pool.acquire_timeout = 0.01
+    try:
+        with pool.acquire():
+            with pytest.raises(sqlite3.OperationalError):
+                with pool.acquire():
+                    pass
+    finally:
+        pool.close()
+
+def test_search_stories_matches_prefix(
+    db_manager: Any,
+    sample_story: Dict[str, Any]
+) -> None:
+    """Test that the last word of a search is matched as a prefix.
+    
+    Args:
+        db_manager: Database manager instance.
+        sample_story: Sample story data for testing.
+    """
+    story_id = db_manager.add_story(**sample_story)
+    
+    assert [row["id"] for row in db_manager.search_stories("brave knig")] == [story_id]
+    assert db_manager.search_stories("brave dragon") == []
+
+def test_search_stories_treats_operators_as_text(
+    db_manager: Any,
+    sample_story: Dict[str, Any]
+) -> None:
+    """Test that quotes and FTS5 operators in a search are plain text.
+    
+    Args:
+        db_manager: Database manager instance.
+        sample_story: Sample story data for testing.
+    """
+    quoted_id = db_manager.add_story(
+        **{**sample_story, "response": 'The knight said "hello" and left.'}
+    )
+    db_manager.add_story(**{**sample_story, "response": "Cats NEAR dogs."})
+    
+    rows = db_manager.search_stories('said "hello')
+    assert [row["id"] for row in rows] == [quoted_id]
+    assert [row["id"] for row in db_manager.search_stories("hello AND")] == [quoted_id]
+    # As operators these would match both stories or fail to parse
+    assert db_manager.search_stories("knight AND dogs") == []
+    assert db_manager.search_stories("NEAR(cats dogs)") == []
+
+def test_search_stories_empty_query_returns_all(
+    db_manager: Any,
+    sample_story: Dict[str, Any]
+) -> None:
+    """Test that an empty search lists every story, newest first.
+    
+    Args:
+        db_manager: Database manager instance.
+        sample_story: Sample story data for testing.
+    """
+    first_id = db_manager.add_story(**sample_story)
+    second_id = db_manager.add_story(**sample_story)
+    
+    for query in ("", "   "):
+        rows = db_manager.search_stories(query)
+        assert [row["id"] for row in rows] == [second_id, first_id]
+
+def test_search_index_follows_updates_and_deletes(
+    file_db_path: str,
+    sample_story: Dict[str, Any]
+) -> None:
+    """Test that the full-text index stays in sync when stories change.
+    
+    Args:
+        file_db_path: Path for a file-backed test database.
+        sample_story: Sample story data for testing.
+    """
+    db = DatabaseManager(db_path=file_db_path)
+    try:
+        story_id = db.add_story(**sample_story)
+        assert [row["id"] for row in db.search_stories("upon a time")] == [story_id]
+        with sqlite3.connect(file_db_path) as conn:
+            conn.execute("""
+                UPDATE stories SET response = 'A quiet tale of a wizard.' WHERE id = ?
+            """, (story_id,))
+        assert db.search_stories("upon a time") == []
+        assert [row["id"] for row in db.search_stories("wizard")] == [story_id]
+        
+        with sqlite3.connect(file_db_path) as conn:
+            conn.execute("DELETE FROM stories WHERE id = ?", (story_id,))
+        assert db.search_stories("wizard") == []
+    finally:
+        db.close()
@@ -3,53 +3,204 @@
 This module contains tests for the story generation features, including document
 loading, vector store operations, and story generation with and without RAG.
 """
-import pytest
+import blake3
+import faiss
 import os
+import pytest
+import requests
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, Any, List
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
+
+from langchain.schema import Document
+from langchain_core.language_models import FakeListChatModel
+from langchain_community.vectorstores import FAISS
 
+from llm_story_generator import story_generator
+from llm_story_generator.config import VECTOR_STORE_SETTINGS
 from llm_story_generator.story_generator import (
-    load_documents, append_to_index, load_vectordb,
-    store_story_to_memory, generate_story, STORY_STYLES
+    append_to_index, load_documents, load_vectordb, load_hash_db, update_hash_db,
+    memory_story_path, store_story_to_memory, generate_story, STORY_STYLES
 )
 
-def test_load_documents(test_dirs: Dict[str, str], sample_document: str) -> None:
+def test_load_documents(loaded_docs: List[Document], sample_document: Any) -> None:
     """Test loading documents from a directory.
     
     Args:
-        test_dirs: Dictionary of test directory paths.
-        sample_document: Path to a sample document for testing.
+        loaded_docs: Documents loaded from the sample document's directory.
+        sample_document: The sample document on disk.
     """
-    docs = load_documents(os.path.dirname(sample_document))
-    assert len(docs) > 0
-    assert any(doc.page_content == "This is a test story document." for doc in docs)
+    assert len(loaded_docs) > 0
+    assert any(doc.page_content == sample_document.content for doc in loaded_docs)
 
-def test_append_to_index(test_dirs: Dict[str, str], sample_document: str) -> None:
+def test_append_to_index(built_vectordb: FAISS) -> None:
     """Test appending documents to the vector index.
     
     Args:
-        test_dirs: Dictionary of test directory paths.
-        sample_document: Path to a sample document for testing.
+        built_vectordb: Vector store built from the sample documents.
     """
-    docs = load_documents(os.path.dirname(sample_document))
-    vectordb = append_to_index(docs)
-    assert vectordb is not None
+    assert built_vectordb is not None
 
-def test_load_vectordb(test_dirs: Dict[str, str], sample_document: str) -> None:
-    """Test loading the vector database.
+def test_append_to_index_dedups_chunks(isolated_index: Path) -> None:
+    """Test that identical chunks from different files are stored once.
     
     Args:
-        test_dirs: Dictionary of test directory paths.
-        sample_document: Path to a sample document for testing.
+        isolated_index: Empty documents directory with its own index.
+    """
+    text = "A chunk shared by two documents."
+    (isolated_index / "a.txt").write_text(text, encoding="utf-8")
+    (isolated_index / "b.txt").write_text(text, encoding="utf-8")
+    
+    vectordb = append_to_index(load_documents(str(isolated_index)))
+    
+    chunk_id = blake3.blake3(text.encode("utf-8")).hexdigest()
+    assert list(vectordb.index_to_docstore_id.values()) == [chunk_id]
+    hash_db = load_hash_db()
+    assert hash_db["a.txt"]["ids"] == hash_db["b.txt"]["ids"] == [chunk_id]
+    assert hash_db["a.txt"]["indexed"] and hash_db["b.txt"]["indexed"]
+
+def test_append_to_index_skips_indexed_chunks(isolated_index: Path) -> None:
+    """Test that a new file whose chunks are already indexed adds nothing.
+    
+    Args:
+        isolated_index: Empty documents directory with its own index.
     """
-    # First create the index
-    docs = load_documents(os.path.dirname(sample_document))
+    text = "A chunk that is indexed before its copy appears."
+    (isolated_index / "a.txt").write_text(text, encoding="utf-8")
+    append_to_index(load_documents(str(isolated_index)))
+    
+    (isolated_index / "b.txt").write_text(text, encoding="utf-8")
+    new_docs = load_documents(str(isolated_index))
+    vectordb = append_to_index(new_docs)
+    
+    assert [doc.metadata["rel_path"] for doc in new_docs] == ["b.txt"]
+    assert vectordb.index.ntotal == 1
+    assert load_hash_db()["b.txt"]["ids"] == load_hash_db()["a.txt"]["ids"]
+
+def test_entries_without_indexed_flag_are_reindexed(isolated_index: Path) -> None:
+    """Test that hash entries predating the ``indexed`` flag count as not indexed.
+    
+    Args:
+        isolated_index: Empty documents directory with its own index.
+    """
+    (isolated_index / "old.txt").write_text(
+        "A story from an old index.", encoding="utf-8"
+    )
+    append_to_index(load_documents(str(isolated_index)))
+    entry = load_hash_db()["old.txt"]
+    del entry["indexed"]
+    update_hash_db({"old.txt": entry})
+    
+    docs = load_documents(str(isolated_index))
+    assert [doc.metadata["rel_path"] for doc in docs] == ["old.txt"]
     append_to_index(docs)
+    assert load_hash_db()["old.txt"]["indexed"] is True
+
+def test_append_to_index_removes_stale_chunks(isolated_index: Path) -> None:
+    """Test that re-indexing an edited file drops the chunks of its old text.
+    
+    Args:
+        isolated_index: Empty documents directory with its own index.
+    """
+    doc_path = isolated_index / "story.txt"
+    doc_path.write_text("The first draft of the story.", encoding="utf-8")
+    append_to_index(load_documents(str(isolated_index)))
+    old_ids = load_hash_db()["story.txt"]["ids"]
+    
+    doc_path.write_text(
+        "A rewritten, longer second draft of the story.", encoding="utf-8"
+    )
+    vectordb = append_to_index(load_documents(str(isolated_index)))
+    
+    new_ids = load_hash_db()["story.txt"]["ids"]
+    indexed_ids = set(vectordb.index_to_docstore_id.values())
+    assert indexed_ids == set(new_ids)
+    assert not indexed_ids & set(old_ids)
+    assert vectordb.index.ntotal == len(new_ids)
+
+def test_append_to_index_searches_ivf_copy(
+    isolated_index: Path,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that large indexes are searched through an IVF copy.
+    
+    Args:
+        isolated_index: Empty documents directory with its own index.
+        monkeypatch: Pytest fixture used to lower the IVF thresholds.
+    """
+    monkeypatch.setitem(VECTOR_STORE_SETTINGS, "ivf_min_chunks", 16)
+    nprobe = 2
+    monkeypatch.setitem(VECTOR_STORE_SETTINGS, "ivf_nprobe", nprobe)
+    texts = [f"Story number {i} about island {i}." for i in range(20)]
+    for i, text in enumerate(texts):
+        (isolated_index / f"doc_{i}.txt").write_text(text, encoding="utf-8")
+    
+    vectordb = append_to_index(load_documents(str(isolated_index)))
+    
+    assert isinstance(vectordb.index, faiss.IndexIVFFlat)
+    assert vectordb.index.nprobe == nprobe
+    assert vectordb.index.ntotal == len(texts)
+    # The returned copy is the cached one, so loading doesn't train it again
+    assert load_vectordb() is vectordb
+    [doc] = vectordb.similarity_search(texts[7], k=1)
+    assert doc.metadata["rel_path"] == "doc_7.txt"
+    # The index on disk stays flat so stale chunks can still be deleted
+    saved = faiss.read_index(os.path.join(story_generator.INDEX_PATH, "index.faiss"))
+    assert not isinstance(saved, faiss.IndexIVFFlat)
+
+def test_append_to_index_keeps_small_index_flat(isolated_index: Path) -> None:
+    """Test that indexes below ``ivf_min_chunks`` are searched directly.
     
-    # Then try to load it
+    Args:
+        isolated_index: Empty documents directory with its own index.
+    """
+    (isolated_index / "doc.txt").write_text("A single short story.", encoding="utf-8")
+    
+    vectordb = append_to_index(load_documents(str(isolated_index)))
+    
+    assert vectordb.index.ntotal < VECTOR_STORE_SETTINGS["ivf_min_chunks"]
+    assert not isinstance(vectordb.index, faiss.IndexIVFFlat)
+
+def test_append_to_index_without_text(isolated_index: Path) -> None:
+    """Test that building the first index from empty files fails cleanly.
+    
+    Args:
+        isolated_index: Empty documents directory with its own index.
+    """
+    (isolated_index / "empty.txt").write_text("", encoding="utf-8")
+    
+    with pytest.raises(ValueError, match="No document text to index"):
+        append_to_index(load_documents(str(isolated_index)))
+    assert not load_hash_db()["empty.txt"]["indexed"]
+
+def test_load_vectordb(built_vectordb: FAISS) -> None:
+    """Test loading the vector database.
+    
+    Args:
+        built_vectordb: Vector store built from the sample documents, which
+            ensures the index exists on disk.
+    """
     vectordb = load_vectordb()
     assert vectordb is not None
 
+def test_update_hash_db_concurrent_writers(test_dirs: Dict[str, str]) -> None:
+    """Test that concurrent hash database updates don't lose entries.
+    
+    Args:
+        test_dirs: Dictionary of test directory paths.
+    """
+    entries = [
+        {f"concurrent_{i}.txt": {"h": str(i), "mtime_ns": 0, "size": 0}}
+        for i in range(32)
+    ]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(update_hash_db, entries))
+    
+    hash_db = load_hash_db()
+    for entry in entries:
+        assert entry.items() <= hash_db.items()
+
 def test_store_story_to_memory(test_dirs: Dict[str, str]) -> None:
     """Test storing a story to memory.
     
@@ -59,26 +210,43 @@ def test_store_story_to_memory(test_dirs: Dict[str, str]) -> None:
     story_text = "This is a test story"
     timestamp = "2024-01-01T12:00:00"
     
-    path = store_story_to_memory(story_text, timestamp)
-    assert os.path.exists(path)
+    path = Path(store_story_to_memory(story_text, timestamp))
+    assert path == Path(memory_story_path(timestamp))
+    # read_text raises if the file wasn't written, so no separate exists() check
+    content = path.read_text(encoding="utf-8")
+    assert story_text in content
+    assert timestamp in content
+
+def test_failed_background_write_is_logged(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that a memory story write failing on the I/O pool is logged.
+    
+    Args:
+        caplog: Pytest fixture capturing log records.
+    """
+    future: Future[str] = Future()
+    future.set_exception(OSError("disk full"))
     
-    with open(path, "r", encoding="utf-8") as f:
-        content = f.read()
-        assert story_text in content
-        assert timestamp in content
+    story_generator._log_failed_write(future)
+    
+    assert "Background memory story write failed" in caplog.text
+    assert "disk full" in caplog.text
 
-@patch('llm_story_generator.story_generator.load_llm')
-def test_generate_story_direct(mock_load_llm: MagicMock, db_manager: Any) -> None:
+def test_generate_story_direct(
+    fake_llm: FakeListChatModel,
+    db_manager: Any,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test direct story generation without RAG.
     
     Args:
-        mock_load_llm: Mocked LLM loader.
+        fake_llm: Fake chat model that returns a predefined response.
         db_manager: Database manager instance.
+        monkeypatch: Pytest fixture used to stub the LLM loader.
     """
-    # Mock the LLM response
-    mock_llm = MagicMock()
-    mock_llm.return_value = "Generated story content"
-    mock_load_llm.return_value = mock_llm
+    monkeypatch.setattr(
+        "llm_story_generator.story_generator.load_llm",
+        lambda system_prompt=None: fake_llm
+    )
     
     answer, source_docs, now = generate_story(
         user_input="Write a story",
@@ -93,43 +261,100 @@ def test_generate_story_direct(mock_load_llm: MagicMock, db_manager: Any) -> Non
     assert len(source_docs) == 0
     assert now is not None
 
-@patch('llm_story_generator.story_generator.load_llm')
-@patch('llm_story_generator.story_generator.append_to_index')
 def test_generate_story_rag(
-    mock_append_to_index: MagicMock,
-    mock_load_llm: MagicMock,
+    fake_llm: FakeListChatModel,
     db_manager: Any,
-    sample_document: str
+    sample_document: Any,
+    built_vectordb: FAISS,
+    monkeypatch: pytest.MonkeyPatch
 ) -> None:
     """Test story generation with RAG.
     
     Args:
-        mock_append_to_index: Mocked index appender.
-        mock_load_llm: Mocked LLM loader.
+        fake_llm: Fake chat model that returns a predefined response.
         db_manager: Database manager instance.
-        sample_document: Path to a sample document for testing.
+        sample_document: The sample document on disk.
+        built_vectordb: Vector store built from the sample documents, which
+            marks the sample document as indexed.
+        monkeypatch: Pytest fixture used to stub the LLM loader.
     """
-    # Mock the vector database and LLM
-    mock_vectordb = MagicMock()
-    mock_vectordb.as_retriever.return_value = MagicMock()
-    mock_append_to_index.return_value = mock_vectordb
-    
-    mock_llm = MagicMock()
-    mock_llm.return_value = "Generated story content"
-    mock_load_llm.return_value = mock_llm
+    monkeypatch.setattr(
+        "llm_story_generator.story_generator.load_llm",
+        lambda system_prompt=None: fake_llm
+    )
     
     answer, source_docs, now = generate_story(
         user_input="Write a story",
         selected_style="Creative Storyteller",
         custom_prompt=STORY_STYLES["Creative Storyteller"],
         mode="RAG with Documents",
-        selected=[os.path.basename(sample_document)],
+        selected=[sample_document.path.name],
         db_manager=db_manager
     )
     
     assert answer == "Generated story content"
     assert now is not None
 
+def test_generate_story_keeps_server_check_on_validation_error(
+    fake_llm: FakeListChatModel,
+    db_manager: Any,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a failure unrelated to the server keeps the cached server check.
+    
+    Args:
+        fake_llm: Fake chat model that returns a predefined response.
+        db_manager: Database manager instance.
+        monkeypatch: Pytest fixture used to stub the LLM loader and server check.
+    """
+    verify_server = MagicMock()
+    monkeypatch.setattr(story_generator, "_verify_server", verify_server)
+    monkeypatch.setattr(
+        story_generator, "load_llm", lambda system_prompt=None: fake_llm
+    )
+    
+    with pytest.raises(ValueError, match="No documents selected"):
+        generate_story(
+            user_input="Write a story",
+            selected_style="Creative Storyteller",
+            custom_prompt=STORY_STYLES["Creative Storyteller"],
+            mode="RAG with Documents",
+            selected=[],
+            db_manager=db_manager
+        )
+    
+    verify_server.cache_clear.assert_not_called()
+
+def test_generate_story_rechecks_server_after_connection_error(
+    db_manager: Any,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that losing the server clears the cached server check.
+    
+    Args:
+        db_manager: Database manager instance.
+        monkeypatch: Pytest fixture used to stub the LLM loader and server check.
+    """
+    verify_server = MagicMock()
+    unreachable_llm = MagicMock()
+    unreachable_llm.invoke.side_effect = requests.ConnectionError("server is down")
+    monkeypatch.setattr(story_generator, "_verify_server", verify_server)
+    monkeypatch.setattr(
+        story_generator, "load_llm", lambda system_prompt=None: unreachable_llm
+    )
+    
+    with pytest.raises(ValueError):
+        generate_story(
+            user_input="Write a story",
+            selected_style="Creative Storyteller",
+            custom_prompt=STORY_STYLES["Creative Storyteller"],
+            mode="Direct Generation",
+            selected=[],
+            db_manager=db_manager
+        )
+    
+    verify_server.cache_clear.assert_called_once()
+
 def test_story_styles() -> None:
     """Test that story styles are properly defined."""
     assert "Creative Storyteller" in STORY_STYLES
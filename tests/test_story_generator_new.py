@@ -4,49 +4,43 @@ This module contains tests for the enhanced story generation features, including
 document loading, vector store operations, and story generation with and without RAG.
 """
 import pytest
-import os
+from pathlib import Path
 from typing import Dict, Any, List
-from unittest.mock import patch, MagicMock
+
+from langchain.schema import Document
+from langchain_core.language_models import FakeListChatModel
+from langchain_community.vectorstores import FAISS
 
 from llm_story_generator.story_generator import (
-    load_documents, append_to_index, load_vectordb,
+    load_vectordb,
     store_story_to_memory, generate_story, STORY_STYLES
 )
 
-def test_load_documents(test_dirs: Dict[str, str], sample_document: str) -> None:
+def test_load_documents(loaded_docs: List[Document], sample_document: Any) -> None:
     """Test loading documents from a directory.
     
     Args:
-        test_dirs: Dictionary of test directory paths.
-        sample_document: Path to a sample document for testing.
+        loaded_docs: Documents loaded from the sample document's directory.
+        sample_document: The sample document on disk.
     """
-    docs = load_documents(os.path.dirname(sample_document))
-    assert len(docs) > 0
-    assert any(doc.page_content == "This is a test story document." for doc in docs)
+    assert len(loaded_docs) > 0
+    assert any(doc.page_content == sample_document.content for doc in loaded_docs)
 
-def test_append_to_index(test_dirs: Dict[str, str], sample_document: str) -> None:
+def test_append_to_index(built_vectordb: FAISS) -> None:
     """Test appending documents to the vector index.
     
     Args:
-        test_dirs: Dictionary of test directory paths.
-        sample_document: Path to a sample document for testing.
+        built_vectordb: Vector store built from the sample documents.
     """
-    docs = load_documents(os.path.dirname(sample_document))
-    vectordb = append_to_index(docs)
-    assert vectordb is not None
+    assert built_vectordb is not None
 
-def test_load_vectordb(test_dirs: Dict[str, str], sample_document: str) -> None:
+def test_load_vectordb(built_vectordb: FAISS) -> None:
     """Test loading the vector database.
     
     Args:
-        test_dirs: Dictionary of test directory paths.
-        sample_document: Path to a sample document for testing.
+        built_vectordb: Vector store built from the sample documents, which
+            ensures the index exists on disk.
     """
-    # First create the index
-    docs = load_documents(os.path.dirname(sample_document))
-    append_to_index(docs)
-    
-    # Then try to load it
     vectordb = load_vectordb()
     assert vectordb is not None
 
@@ -59,16 +53,17 @@ def test_store_story_to_memory(test_dirs: Dict[str, str]) -> None:
     story_text = "This is a test story"
     timestamp = "2024-01-01T12:00:00"
     
-    path = store_story_to_memory(story_text, timestamp)
-    assert os.path.exists(path)
-    
-    with open(path, "r", encoding="utf-8") as f:
-        content = f.read()
-        assert story_text in content
-        assert timestamp in content
+    path = Path(store_story_to_memory(story_text, timestamp))
+    # read_text raises if the file wasn't written, so no separate exists() check
+    content = path.read_text(encoding="utf-8")
+    assert story_text in content
+    assert timestamp in content
 
-@patch('llm_story_generator.story_generator.load_llm')
-def test_generate_story_direct(mock_load_llm: MagicMock, db_manager: Any) -> None:
+def test_generate_story_direct(
+    fake_llm: FakeListChatModel,
+    db_manager: Any,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test direct story generation without RAG.
     
     This test verifies that story generation works correctly in direct mode,
@@ -76,8 +71,9 @@ def test_generate_story_direct(mock_load_llm: MagicMock, db_manager: Any) -> Non
     response and checks that the generation process completes successfully.
     
     Args:
-        mock_load_llm: Mocked LLM loader that returns a predefined response.
+        fake_llm: Fake chat model that returns a predefined response.
         db_manager: Database manager instance for story operations.
+        monkeypatch: Pytest fixture used to stub the LLM loader.
     
     The test verifies:
     - Story generation completes without errors
@@ -85,10 +81,10 @@ def test_generate_story_direct(mock_load_llm: MagicMock, db_manager: Any) -> Non
     - No source documents are returned
     - A valid timestamp is generated
     """
-    # Mock the LLM response
-    mock_llm = MagicMock()
-    mock_llm.return_value = "Generated story content"
-    mock_load_llm.return_value = mock_llm
+    monkeypatch.setattr(
+        "llm_story_generator.story_generator.load_llm",
+        lambda system_prompt=None: fake_llm
+    )
     
     answer, source_docs, now = generate_story(
         user_input="Write a story",
@@ -103,37 +99,34 @@ def test_generate_story_direct(mock_load_llm: MagicMock, db_manager: Any) -> Non
     assert len(source_docs) == 0
     assert now is not None
 
-@patch('llm_story_generator.story_generator.load_llm')
-@patch('llm_story_generator.story_generator.append_to_index')
 def test_generate_story_rag(
-    mock_append_to_index: MagicMock,
-    mock_load_llm: MagicMock,
+    fake_llm: FakeListChatModel,
     db_manager: Any,
-    sample_document: str
+    sample_document: Any,
+    built_vectordb: FAISS,
+    monkeypatch: pytest.MonkeyPatch
 ) -> None:
     """Test story generation with RAG.
     
     Args:
-        mock_append_to_index: Mocked index appender.
-        mock_load_llm: Mocked LLM loader.
+        fake_llm: Fake chat model that returns a predefined response.
         db_manager: Database manager instance.
-        sample_document: Path to a sample document for testing.
+        sample_document: The sample document on disk.
+        built_vectordb: Vector store built from the sample documents, which
+            marks the sample document as indexed.
+        monkeypatch: Pytest fixture used to stub the LLM loader.
     """
-    # Mock the vector database and LLM
-    mock_vectordb = MagicMock()
-    mock_vectordb.as_retriever.return_value = MagicMock()
-    mock_append_to_index.return_value = mock_vectordb
-    
-    mock_llm = MagicMock()
-    mock_llm.return_value = "Generated story content"
-    mock_load_llm.return_value = mock_llm
+    monkeypatch.setattr(
+        "llm_story_generator.story_generator.load_llm",
+        lambda system_prompt=None: fake_llm
+    )
     
     answer, source_docs, now = generate_story(
         user_input="Write a story",
         selected_style="Creative Storyteller",
         custom_prompt=STORY_STYLES["Creative Storyteller"],
         mode="RAG with Documents",
-        selected=[os.path.basename(sample_document)],
+        selected=[sample_document.path.name],
         db_manager=db_manager
     )
     